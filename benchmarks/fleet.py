@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Cost of the other vessels on the orbital MFD, as the number of vessels grows.
+
+    python -m benchmarks.fleet --vessels 10 100 500
+
+build: orbits and curves of a new FleetSnapshot, received every couple of seconds.
+positions: vessel positions propagated and projected, each frame.
+frame: MFD frame with the vessels, the vessel positions move every frame.
+"""
+import argparse
+import time
+import timeit
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+from panel.orbital.mfd_orbital import MFDOrbital
+from panel.planet_data import BODIES
+from panel.server.simulation import KeplerSimulation
+from panel.telemetry.fleet import FleetGeometry, fleet_from_state_vectors
+from panel.telemetry.telemetry import Telemetry
+
+
+
+def simulated_fleet(count, ut):
+    """
+    Return (active vessel snapshot, FleetSnapshot of count other vessels) at ut
+    """
+    simulation = KeplerSimulation(count + 1)
+    simulation.frozen_ut = ut
+    state_vectors = [vessel.orbit.state_vector() for vessel in simulation.vessels]
+    telemetry = Telemetry()
+    telemetry.update_from_state_vector(ut, simulation.body.name.lower(), np.identity(3), *state_vectors[0])
+    positions, velocities = zip(*state_vectors[1:]) if count else ((), ())
+    fleet = fleet_from_state_vectors(ut, BODIES.ids[simulation.body.name.lower()],
+                                     [vessel.name for vessel in simulation.vessels[1:]], positions, velocities)
+    return telemetry.snapshot(), fleet
+
+
+
+def bench(number, stmt):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1000.
+
+
+
+def frame_time(snapshot, fleet, frames):
+    figure = MFDOrbital(None)
+    figure.resize(600, 600)
+    figure.show()
+    QApplication.processEvents()
+    figure.update_fleet(fleet)
+    # Warm up: artists creation and first background
+    for i in range(5):
+        figure.update_mfd(snapshot._replace(ut=snapshot.ut + i))
+    times = []
+    for i in range(frames):
+        start = time.perf_counter()
+        figure.update_mfd(snapshot._replace(ut=snapshot.ut + 30. * (i + 1)))
+        times.append(time.perf_counter() - start)
+    figure.close()
+    return np.median(times) * 1000.
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Other vessels drawing benchmark')
+    parser.add_argument('--vessels', help='numbers of other vessels', type=int, nargs='+',
+                        default=[0, 10, 100, 500])
+    parser.add_argument('--frames', type=int, default=100)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    print('%8s %10s %14s %10s' % ('vessels', 'build ms', 'positions ms', 'frame ms'))
+    for count in args.vessels:
+        snapshot, fleet = simulated_fleet(count, 1000.)
+        telemetry = Telemetry()
+        telemetry.update_from_snapshot(snapshot)
+        geometry = FleetGeometry(fleet)
+        build = bench(20, lambda: FleetGeometry(fleet))
+        positions = bench(200, lambda: geometry.project(telemetry.display_matrix, geometry.positions(2000.)))
+        print('%8d %10.3f %14.3f %10.2f' % (count, build, positions, frame_time(snapshot, fleet, args.frames)))
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""
+Check the locally computed node times against krpc ut_at_true_anomaly.
+
+    python -m benchmarks.node_times --host 1.2.3.4
+    python -m benchmarks.node_times --recording flight.ktlm
+
+--host reads the active vessel of a live server, errors then include the
+time elapsed between the ut read and the orbit reads. A recording must come
+from a panel version reading node times with ut_at_true_anomaly RPCs.
+Without either, the recordings of benchmarks/recordings are checked. Without
+any, a stand-in server is started, its clock frozen at a different ut for each
+sample: it answers ut_at_true_anomaly with the same panel.telemetry.kepler
+functions as the local node times, so its errors only check their consistency,
+not the node times against KSP.
+"""
+import argparse
+import glob
+import os
+import time
+import numpy as np
+import krpc
+
+from panel.server.krpc_server import KrpcServer
+from panel.server.simulation import KeplerSimulation
+from panel.telemetry.recording import TelemetryRecording
+from panel.telemetry.telemetry import Telemetry
+
+NODES = ('time_to_ascending_node', 'time_to_descending_node')
+
+# Recordings of real KSP flights, checked by default
+RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings', '*.ktlm')
+
+
+
+def report(errors):
+    for name in NODES:
+        error = np.abs(errors[name])
+        print('%-24s p50 %.3g s, p99 %.3g s, max %.3g s over %d samples'
+              % (name, np.nanpercentile(error, 50), np.nanpercentile(error, 99), np.nanmax(error), len(error)))
+
+
+def check_recording(path):
+    recording = TelemetryRecording(path)
+    telemetry = Telemetry()
+    errors = dict((name, []) for name in NODES)
+    for i in range(len(recording)):
+        snapshot = recording.snapshot(i)
+        telemetry.update_from_snapshot(snapshot)
+        telemetry.update_node_times()
+        for name in NODES:
+            errors[name].append(getattr(telemetry, name) - getattr(snapshot, name))
+    report(errors)
+    if all(np.nanmax(np.abs(errors[name]), initial=0.) == 0. for name in NODES):
+        print('The node times of this recording were computed locally, they are not a KSP ground truth')
+
+
+def check_server(conn, samples, interval, simulation=None):
+    telemetry = Telemetry()
+    errors = dict((name, []) for name in NODES)
+    local_time = 0.
+    rpc_time = 0.
+    for i in range(samples):
+        if simulation:
+            simulation.frozen_ut = i * 97.3
+        space_center = conn.space_center
+        orbit = space_center.active_vessel.orbit
+        ut = space_center.ut
+        start = time.perf_counter()
+        ascending_node = orbit.ut_at_true_anomaly(-orbit.argument_of_periapsis) - ut
+        descending_node = orbit.ut_at_true_anomaly(np.pi - orbit.argument_of_periapsis) - ut
+        rpc_time += time.perf_counter() - start
+        telemetry.update_from_krpc_active_vessel(ut, space_center.active_vessel)
+        start = time.perf_counter()
+        telemetry.update_node_times()
+        local_time += time.perf_counter() - start
+        errors['time_to_ascending_node'].append(telemetry.time_to_ascending_node - ascending_node)
+        errors['time_to_descending_node'].append(telemetry.time_to_descending_node - descending_node)
+        time.sleep(interval)
+    report(errors)
+    print('node times: %.1f us local, %.1f us with RPCs' % (local_time / samples * 1e6, rpc_time / samples * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local node times check')
+    parser.add_argument('-H', '--host', help='ksp server, a stand-in server is started without it')
+    parser.add_argument('--recording', help='recording with node times read by RPC', action='append', default=[])
+    parser.add_argument('--samples', type=int, default=200)
+    parser.add_argument('--interval', help='s between samples', type=float, default=0.01)
+    args = parser.parse_args()
+
+    paths = args.recording or ([] if args.host else sorted(glob.glob(RECORDINGS)))
+    if paths:
+        for path in paths:
+            print(path)
+            check_recording(path)
+        return
+    server = None
+    if args.host:
+        conn = krpc.connect(address=args.host)
+    else:
+        print('No recording: the stand-in server shares panel.telemetry.kepler with the local node times, '
+              'these errors are not checked against KSP')
+        server = KrpcServer(KeplerSimulation(), rpc_port=0, stream_port=0)
+        server.start()
+        conn = krpc.connect(rpc_port=server.rpc_port, stream_port=server.stream_port)
+    check_server(conn, args.samples, args.interval, server and server.simulation)
+    conn.close()
+    if server:
+        server.stop()
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+"""
+End to end benchmark of the MFD frame pipeline, on an offscreen Agg canvas.
+
+    python -m benchmarks.pipeline --json after.json --compare before.json
+
+Each trajectory is run twice:
+- stages: every stage of a frame timed on its own, ending with a full canvas draw,
+- frame: MFDOrbital.update_mfd as the panel calls it, with blitting and skipped frames.
+
+--painter runs the QPainter MFD instead, its draw is a widget repaint.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication
+import matplotlib
+
+from panel.orbital.mfd_orbital import MFDOrbital
+from panel.orbital.mfd_orbital_painter import MFDOrbitalPainter
+from panel.server.simulation import KeplerSimulation, SimOrbit, SimVessel
+from panel.telemetry import kepler
+from panel.telemetry.recording import TelemetryRecording
+from panel.telemetry.telemetry import Telemetry
+
+STAGES = ('telemetry', 'derived', 'orbit', 'text', 'draw', 'total')
+
+# name: (eccentricity, periapsis in body radius)
+TRAJECTORIES = {
+    'elliptic': (0.3, 1.2),
+    'near_parabolic_ellipse': (0.995, 1.2),
+    'near_parabolic_hyperbola': (1.005, 1.2),
+    'hyperbolic': (1.5, 1.2),
+}
+
+# Values read by the orbit and point plots
+DERIVED_VALUES = (
+    'orbit_bounds',
+    'periapsis_x',
+    'periapsis_y',
+    'ascending_node_x',
+    'ascending_node_y',
+    'descending_node_x',
+    'descending_node_y',
+    'vessel_x',
+    'vessel_y',
+)
+ELLIPSE_VALUES = DERIVED_VALUES + ('focus_x', 'focus_y', 'width', 'height')
+HYPERBOLE_VALUES = DERIVED_VALUES + ('hyperbole_points',)
+
+
+
+def synthetic_snapshots(eccentricity, periapsis, frames, step=None):
+    """
+    Snapshots of one orbit, periapsis in body radius. A closed orbit inside the SOI
+    is covered over one period, any other from SOI exit to SOI exit.
+    With a step, in s of ut, frames are taken step apart from the start of that span.
+    """
+    simulation = KeplerSimulation()
+    body = simulation.body
+    periapsis *= body.equatorial_radius
+    semi_major_axis = periapsis / (1 - eccentricity)
+    orbit = SimOrbit(simulation, body, semi_major_axis, eccentricity, inclination=0.4,
+                     longitude_of_ascending_node=0.8, argument_of_periapsis=1.3)
+    vessel = SimVessel('Benchmark', orbit)
+    n = float(kepler.mean_motion(body.mu, semi_major_axis))
+    if eccentricity < 1 and orbit.apoapsis < body.sphere_of_influence:
+        uts = np.linspace(0., 2 * math.pi / n, frames, endpoint=False)
+    else:
+        p = semi_major_axis * (1 - eccentricity ** 2)
+        true_anomaly = math.acos((p / body.sphere_of_influence - 1) / eccentricity)
+        limit = float(kepler.mean_anomaly(true_anomaly, eccentricity)) / n
+        uts = np.linspace(-limit, limit, frames)
+    if step:
+        uts = uts[0] + np.arange(frames) * step
+
+    telemetry = Telemetry()
+    snapshots = []
+    for ut in uts:
+        simulation.frozen_ut = float(ut)
+        telemetry.update_from_krpc_active_vessel(simulation.ut, vessel)
+        snapshots.append(telemetry.snapshot())
+    return snapshots
+
+
+
+def run_stages(figure, snapshots):
+    timings = dict((stage, []) for stage in STAGES)
+    telemetry = figure.telemetry
+    clock = time.perf_counter
+    for snapshot in snapshots:
+        t0 = clock()
+        telemetry.update_from_snapshot(snapshot)
+        telemetry.projection_mode = figure.projection_mode
+        t1 = clock()
+        plot = figure.ellipse_orbit_plot if telemetry.eccentricity < 1 else figure.hyperbole_orbit_plot
+        telemetry.__class__ = plot._compute_class
+        for name in ELLIPSE_VALUES if telemetry.eccentricity < 1 else HYPERBOLE_VALUES:
+            getattr(telemetry, name)
+        telemetry.__class__ = Telemetry
+        t2 = clock()
+        figure.ref_planet_plot.update_ref_planet(telemetry)
+        figure.draw_vessel_orbit(telemetry)
+        figure.view_limits.update(telemetry.ref_body_id, figure._orbit_bounds())
+        t3 = clock()
+        figure.ship_text.update_text(telemetry)
+        figure.projection_text.update_text(figure.projection_mode)
+        t4 = clock()
+        figure.draw()
+        t5 = clock()
+        for stage, start, end in zip(STAGES, (t0, t1, t2, t3, t4, t0), (t1, t2, t3, t4, t5, t5)):
+            timings[stage].append(end - start)
+    return timings
+
+
+def run_frames(figure, snapshots):
+    clock = time.perf_counter
+    timings = []
+    figure.render_gate.reset_stats()
+    for snapshot in snapshots:
+        start = clock()
+        figure.update_mfd(snapshot)
+        timings.append(clock() - start)
+    return timings, figure.render_gate.skip_rate
+
+
+def summary(samples):
+    samples = np.asarray(samples) * 1000.
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+    }
+
+
+def benchmark(snapshots, blit, painter=False):
+    figure = MFDOrbitalPainter(None) if painter else MFDOrbital(None, blit=blit)
+    figure.resize(600, 600)
+    figure.show()
+    # The offscreen window is only exposed, and painted, once shown
+    QApplication.processEvents()
+    # Warm up: artists creation, font cache, first background
+    for snapshot in snapshots[:5]:
+        figure.update_mfd(snapshot)
+
+    result = dict((stage, summary(samples)) for stage, samples in run_stages(figure, snapshots).items())
+    result['stages_fps'] = 1000. / result['total']['mean_ms']
+    frame, skip_rate = run_frames(figure, snapshots)
+    result['frame'] = summary(frame)
+    result['frame_fps'] = 1000. / result['frame']['mean_ms']
+    result['skip_rate'] = skip_rate
+    figure.close()
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    print('%-26s %-10s %10s %10s %10s' % ('trajectory', 'stage', 'p50 ms', 'p99 ms', 'vs base'))
+    for name, result in results.items():
+        for stage in STAGES + ('frame',):
+            p50 = result[stage]['p50_ms']
+            compare = ''
+            if baseline and name in baseline and stage in baseline[name]:
+                compare = '%+9.1f%%' % ((p50 / baseline[name][stage]['p50_ms'] - 1) * 100)
+            print('%-26s %-10s %10.3f %10.3f %10s' % (name, stage, p50, result[stage]['p99_ms'], compare))
+        print('%-26s %.0f fps stages, %.0f fps frame, %.0f%% frames skipped'
+              % (name, result['stages_fps'], result['frame_fps'], result['skip_rate'] * 100))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MFD frame pipeline benchmark')
+    parser.add_argument('--frames', help='frames per trajectory', type=int, default=300)
+    parser.add_argument('--trajectory', help='synthetic trajectories to run, all by default',
+                        action='append', choices=sorted(TRAJECTORIES))
+    parser.add_argument('--recording', help='also run a telemetry recording', action='append', default=[])
+    parser.add_argument('--no-blit', help='benchmark without blitting', action='store_true')
+    parser.add_argument('--painter', help='benchmark the QPainter MFD', action='store_true')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='json results of a previous run to compare with')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    runs = {}
+    for name in args.trajectory or TRAJECTORIES:
+        runs[name] = synthetic_snapshots(*TRAJECTORIES[name], frames=args.frames)
+    for path in args.recording:
+        recording = TelemetryRecording(path)
+        runs[os.path.basename(path)] = [recording.snapshot(i) for i in range(len(recording))]
+
+    results = dict((name, benchmark(snapshots, not args.no_blit, args.painter)) for name, snapshots in runs.items())
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'matplotlib': matplotlib.__version__,
+                'frames': args.frames,
+                'blit': not args.no_blit,
+                'painter': args.painter,
+                'results': results,
+            }, f, indent=2)
+    app.quit()
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""
+Error budget of the local Kepler propagation: each sample is propagated to the
+ut of a later sample and compared with it.
+
+    python -m benchmarks.propagation --recording flight.ktlm
+
+Without --recording, the recordings of benchmarks/recordings are checked.
+Without any, samples come from the Kepler simulation every 25 ms of ut: the
+simulation uses the same panel.telemetry.kepler functions as the propagation,
+so its errors only check their consistency, not the propagation against KSP.
+"""
+import argparse
+import glob
+import os
+import timeit
+import numpy as np
+
+from benchmarks.pipeline import synthetic_snapshots, TRAJECTORIES
+from panel.telemetry.propagation import body_mu, propagate
+from panel.telemetry.recording import TelemetryRecording
+
+# Propagation horizons, in s of ut
+HORIZONS = (0.1, 0.5, 1., 5., 30.)
+
+# Recordings of real KSP flights, checked by default
+RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings', '*.ktlm')
+
+
+
+def position(snapshot):
+    """
+    Vessel position in the orbit plane, from periapsis direction
+    """
+    return snapshot.radius * np.array([np.cos(snapshot.true_anomaly), np.sin(snapshot.true_anomaly)])
+
+
+def errors(snapshots, horizon):
+    uts = np.array([snapshot.ut for snapshot in snapshots])
+    position_errors = []
+    speed_errors = []
+    for i, snapshot in enumerate(snapshots):
+        j = np.searchsorted(uts, snapshot.ut + horizon)
+        if j >= len(snapshots):
+            break
+        target = snapshots[j]
+        propagated = propagate(snapshot, target.ut, body_mu(snapshot.ref_body_name))
+        position_errors.append(np.linalg.norm(position(propagated) - position(target)))
+        speed_errors.append(abs(propagated.speed - target.speed))
+    return np.array(position_errors), np.array(speed_errors)
+
+
+def report(name, snapshots):
+    print('%s, %d samples' % (name, len(snapshots)))
+    print('  %8s %12s %12s %12s %12s' % ('horizon', 'p50 m', 'p99 m', 'max m', 'max m/s'))
+    for horizon in HORIZONS:
+        position_errors, speed_errors = errors(snapshots, horizon)
+        if not len(position_errors):
+            continue
+        print('  %7.1fs %12.4g %12.4g %12.4g %12.4g' % (horizon, np.percentile(position_errors, 50),
+                                                        np.percentile(position_errors, 99),
+                                                        position_errors.max(), speed_errors.max()))
+    number = 2000
+    mu = body_mu(snapshots[0].ref_body_name)
+    best = min(timeit.repeat(lambda: propagate(snapshots[0], snapshots[0].ut + 1., mu), number=number, repeat=5))
+    print('  propagate %.2f us' % (best / number * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kepler propagation error budget')
+    parser.add_argument('--recording', help='telemetry recording to check against', action='append', default=[])
+    args = parser.parse_args()
+
+    paths = args.recording or sorted(glob.glob(RECORDINGS))
+    if paths:
+        for path in paths:
+            recording = TelemetryRecording(path)
+            report(path, [recording.snapshot(i) for i in range(len(recording))])
+        return
+    print('No recording: the simulation shares panel.telemetry.kepler with the propagation, '
+          'these errors are not checked against KSP')
+    for name, (eccentricity, periapsis) in sorted(TRAJECTORIES.items()):
+        report(name, synthetic_snapshots(eccentricity, periapsis, frames=2000, step=0.025))
+
+
+
+if __name__ == '__main__':
+    main()
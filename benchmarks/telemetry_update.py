@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""
+Micro-benchmark of the per frame Telemetry update cost.
+
+    python -m benchmarks.telemetry_update
+"""
+import timeit
+
+from panel.telemetry.hyperbole import HyperboleData
+from panel.telemetry.telemetry import Telemetry, TelemetrySnapshot, ORBIT_FIELDS, TELEMETRY_FIELDS
+
+DERIVED_VALUES = (
+    'cos_inclination',
+    'cos_longitude_of_ascending_node',
+    'sin_longitude_of_ascending_node',
+    'cos_longitude_of_periapsis',
+    'sin_longitude_of_periapsis',
+    'cos_argument_of_periapsis',
+    'sin_argument_of_periapsis',
+)
+
+
+
+class FakeBody(object):
+    name = 'Kerbin'
+
+
+
+class FakeOrbit(object):
+    body = FakeBody()
+
+    def __init__(self):
+        for i, name in enumerate(ORBIT_FIELDS):
+            setattr(self, name, float(i + 1))
+
+
+
+def make_snapshot(ut):
+    values = dict((name, float(i + 1)) for i, name in enumerate(TELEMETRY_FIELDS))
+    values['ut'] = ut
+    values['ref_body_name'] = 'kerbin'
+    values['eccentricity'] = 1.5
+    values['semi_major_axis'] = -1400000.0
+    values['speed'] = 4000.0
+    values['radius'] = 700000.0
+    return TelemetrySnapshot(**values)
+
+
+
+def bench(label, stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5))
+    print('%-24s %8.2f us/frame' % (label, best / number * 1e6))
+
+
+
+def main(number=20000):
+    telemetry = Telemetry()
+    orbit = FakeOrbit()
+    snapshots = [make_snapshot(float(ut)) for ut in range(2)]
+    telemetry.update_from_snapshot(snapshots[0])
+
+    bench('update_from_krpc_orbit', lambda: telemetry.update_from_krpc_orbit(orbit), number)
+    bench('update_from_snapshot', lambda: telemetry.update_from_snapshot(snapshots[1]), number)
+    bench('snapshot', telemetry.snapshot, number)
+    bench('read all fields', lambda: [getattr(telemetry, name) for name in TELEMETRY_FIELDS], number)
+    bench('read cached values', lambda: [getattr(telemetry, name) for name in DERIVED_VALUES], number)
+
+    # The vessel moves along the same trajectory, the hyperbola samples stay valid
+    def update_hyperbole(ut=[0.0]):
+        ut[0] += 1
+        telemetry.update_from_snapshot(snapshots[1]._replace(ut=ut[0], radius=700000.0 + ut[0],
+                                                             speed=4000.0 - ut[0] * 1e-3))
+        return telemetry.hyperbole_points
+    telemetry.__class__ = HyperboleData
+    bench('hyperbole samples', update_hyperbole, number)
+
+
+
+if __name__ == '__main__':
+    main()
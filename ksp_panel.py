@@ -1,58 +1,157 @@
 #!/usr/bin/python3
 
 import sys
+import time
 import argparse
 from PyQt5.QtWidgets import QApplication, QMainWindow
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, QThread
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, QThread, QTimer, Qt
 
 import krpc
 
-from panel.krpc_client import KrpcClient
-from panel.telemetry.telemetry import Telemetry
+from panel.krpc_client import KrpcClient, INGEST
+from panel.replay_source import ReplaySource
+from panel.telemetry.recording import TelemetryRecorder
+from panel.event_loop_monitor import EventLoopMonitor
+from panel.instrumentation import instrumentation
 from panel.orbital.mfd_orbital import MFDOrbital
+from panel.orbital.mfd_orbital_painter import MFDOrbitalPainter
 from panel.mfd.ksp_mfd_button import KspMFDButton
+from panel.telemetry.propagation import KeplerPropagator
 
 
 
 class Interface(QMainWindow):
-    krpc_client_begin_connect = pyqtSignal()
+    telemetry_source_stop = pyqtSignal()
     ksp_connected = pyqtSignal()
     ksp_disconnected = pyqtSignal()
 
-    def __init__(self, ksp_ip):
+    def __init__(self, telemetry_source, blit=True, pixel_tolerance=0.5, display_rate=0, painter=False):
         QMainWindow.__init__(self)
         self.setWindowTitle("Kerbal nav")
 
-        self.orbital = MFDOrbital(None, width=5, height=5)
+        if painter:
+            self.orbital = MFDOrbitalPainter(None, width=5, height=5, pixel_tolerance=pixel_tolerance)
+        else:
+            self.orbital = MFDOrbital(None, width=5, height=5, blit=blit, pixel_tolerance=pixel_tolerance)
         self.mfd = KspMFDButton(self, self.orbital, width=7, height=7)
         self.mfd.move(0, 0)
 
         self.showMaximized()
 
+        self.gui_monitor = EventLoopMonitor(parent=self)
+        self.gui_monitor.blocked_updated.connect(self.gui_blocked_updated)
+        self.gui_monitor.start()
+
+        # With a display rate, the vessel is propagated along its orbit between
+        # telemetry samples and drawn display_rate times per second
+        self.propagator = None
+        if display_rate:
+            self.propagator = KeplerPropagator()
+            self.display_timer = QTimer(self)
+            self.display_timer.setTimerType(Qt.PreciseTimer)
+            self.display_timer.timeout.connect(self.display_propagated)
+            self.display_timer.start(int(1000 / display_rate))
+
+        # Every krpc call, from connection to polling, or replay step runs in ksp_thread event loop
         self.ksp_thread = QThread()
-        self.ksp_client = KrpcClient(ksp_ip)
-        self.ksp_client.moveToThread(self.ksp_thread)
+        self.telemetry_source = telemetry_source
+        self.telemetry_source.moveToThread(self.ksp_thread)
 
-        self.krpc_client_begin_connect.connect(self.ksp_client.connect_to_ksp)
-        self.ksp_client.telemetry_updated.connect(self.telemetry_updated)
+        self.ksp_thread.started.connect(self.telemetry_source.start)
+        self.telemetry_source_stop.connect(self.telemetry_source.stop, Qt.BlockingQueuedConnection)
+        self.telemetry_source.telemetry_updated.connect(self.telemetry_updated)
 
         self.ksp_thread.start()
 
-        self.krpc_client_begin_connect.emit()
 
+    def closeEvent(self, event):
+        self.gui_monitor.stop()
+        self.telemetry_source_stop.emit()
+        self.ksp_thread.quit()
+        self.ksp_thread.wait()
+        QMainWindow.closeEvent(self, event)
 
-    @pyqtSlot(Telemetry)
-    def telemetry_updated(self, telemetry_data):
-        self.orbital.update_mfd(telemetry_data)
+
+    @pyqtSlot()
+    def telemetry_updated(self):
+        mailbox = self.telemetry_source.mailbox
+        snapshot = mailbox.take()
+        if snapshot is None:
+            return
+        instrumentation.set_frame(mailbox.taken_sequence)
+        fleet = self.telemetry_source.fleet_mailbox.take()
+        if fleet is not None:
+            self.orbital.update_fleet(fleet)
+        if self.propagator:
+            self.propagator.update(snapshot, mailbox.taken_put_time)
+            return
+        self.orbital.update_mfd(snapshot)
+        instrumentation.add('frame age', (time.perf_counter() - mailbox.taken_put_time) * 1000.)
+
+
+    @pyqtSlot()
+    def display_propagated(self):
+        now = time.perf_counter()
+        snapshot = self.propagator.snapshot(now)
+        if snapshot is not None:
+            self.orbital.update_mfd(snapshot)
+            instrumentation.add('frame age', (now - self.propagator.sample_time) * 1000.)
+
+
+    @pyqtSlot(float)
+    def gui_blocked_updated(self, blocked):
+        render_gate = self.orbital.render_gate
+        self.statusBar().showMessage('GUI blocked %.0f ms/s, skipped frames %.0f%%'
+                                     % (blocked, render_gate.skip_rate * 100))
+        render_gate.reset_stats()
 
 
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument('-H', '--host', help='ksp server', required=True)
+    parser.add_argument('-H', '--host', help='ksp server')
+    parser.add_argument('--ingest', help='telemetry ingestion mode', default=INGEST.STREAM.value,
+                        choices=[ingest.value for ingest in INGEST])
+    parser.add_argument('--painter', help='draw the MFD with QPainter instead of matplotlib', action='store_true')
+    parser.add_argument('--no-blit', help='redraw the whole MFD every frame', action='store_true')
+    parser.add_argument('--pixel-tolerance', help='skip frames moving nothing by more than this many pixels',
+                        type=float, default=0.5)
+    parser.add_argument('--on-rails', help='while coasting under time warp, read only ut and propagate the orbit',
+                        action='store_true')
+    parser.add_argument('--fleet', help='also draw the other vessels orbiting the active vessel body',
+                        action='store_true')
+    parser.add_argument('--poll-interval', help='telemetry poll interval, in ms, the shortest one in the adaptive '
+                        'poll modes', type=int, default=25)
+    parser.add_argument('--fixed-poll', help='poll every --poll-interval instead of following the orbit, '
+                        'time warp and server latency', action='store_true')
+    parser.add_argument('--display-rate', help='draw the vessel propagated along its orbit this many times '
+                        'per second, 0 to draw each telemetry sample', type=float, default=0)
+    parser.add_argument('--record', help='record the received telemetry to this file', metavar='FILE')
+    parser.add_argument('--replay', help='replay a telemetry recording instead of connecting to ksp', metavar='FILE')
+    parser.add_argument('--replay-speed', help='replay speed factor, 0 for as fast as possible',
+                        type=float, default=1.0)
+    parser.add_argument('--trace', help='write a chrome trace of the worker and GUI threads to this file',
+                        metavar='FILE')
     args = parser.parse_args()
+    if not args.host and not args.replay:
+        parser.error('one of --host or --replay is required')
+    if args.fleet and args.painter:
+        parser.error('--fleet is not drawn by the --painter MFD')
+
+    recorder = TelemetryRecorder(args.record) if args.record else None
+    if args.replay:
+        telemetry_source = ReplaySource(args.replay, args.replay_speed, recorder=recorder)
+    else:
+        telemetry_source = KrpcClient(args.host, INGEST(args.ingest), interval=args.poll_interval,
+                                      adaptive=not args.fixed_poll, on_rails=args.on_rails, fleet=args.fleet,
+                                      recorder=recorder)
+
+    if args.trace:
+        instrumentation.start_trace(args.trace)
 
     app = QApplication(sys.argv)
-    i = Interface(args.host)
-    sys.exit(app.exec_())
\ No newline at end of file
+    i = Interface(telemetry_source, not args.no_blit, args.pixel_tolerance, args.display_rate, args.painter)
+    status = app.exec_()
+    instrumentation.stop_trace()
+    sys.exit(status)
\ No newline at end of file
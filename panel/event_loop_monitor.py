@@ -0,0 +1,52 @@
+import time
+from PyQt5.QtCore import QTimer, pyqtSignal, pyqtSlot, QObject, Qt
+
+
+
+class EventLoopMonitor(QObject):
+    """
+    Measure how long the event loop of the thread owning the monitor was blocked.
+    A short timer is expected to fire every `interval` ms, any extra delay is
+    time the loop spent busy. The total is reported once per `report_interval` ms,
+    in ms of blocking per second.
+    """
+    blocked_updated = pyqtSignal(float)
+
+    def __init__(self, interval=10, report_interval=1000, **kwargs):
+        super(EventLoopMonitor, self).__init__(**kwargs)
+        self._interval = interval
+        self._report_interval = report_interval
+        self._blocked = 0.0
+        self._last_tick = None
+        self._last_report = None
+        self.blocked_per_second = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+
+    def start(self):
+        self._last_tick = self._last_report = time.perf_counter()
+        self._blocked = 0.0
+        self._timer.start(self._interval)
+
+
+    def stop(self):
+        self._timer.stop()
+
+
+    @pyqtSlot()
+    def _tick(self):
+        now = time.perf_counter()
+        late = (now - self._last_tick) * 1000.0 - self._interval
+        if late > 0:
+            self._blocked += late
+        self._last_tick = now
+
+        elapsed = (now - self._last_report) * 1000.0
+        if elapsed >= self._report_interval:
+            self.blocked_per_second = self._blocked * 1000.0 / elapsed
+            self._blocked = 0.0
+            self._last_report = now
+            self.blocked_updated.emit(self.blocked_per_second)
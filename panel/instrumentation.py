@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+
+
+
+class RollingHistogram(object):
+    """
+    Last `size` samples of a measure, with the perf_counter time they were taken.
+    A histogram has a single writer thread, readers may see it mid update.
+    """
+    def __init__(self, size=256):
+        self._values = np.zeros(size)
+        self._times = np.zeros(size)
+        self.count = 0
+
+
+    def add(self, value, now):
+        index = self.count % len(self._values)
+        self._values[index] = value
+        self._times[index] = now
+        self.count += 1
+
+
+    @property
+    def values(self):
+        return self._values[:min(self.count, len(self._values))]
+
+
+    def percentile(self, q):
+        values = self.values
+        if not len(values):
+            return float('nan')
+        return float(np.percentile(values, q))
+
+
+    def mean(self):
+        values = self.values
+        if not len(values):
+            return float('nan')
+        return float(values.mean())
+
+
+    def rate(self, now, window=1.0):
+        """
+        Samples per second over the last `window` seconds
+        """
+        return np.count_nonzero(self._times[:min(self.count, len(self._times))] > now - window) / window
+
+
+
+class TraceWriter(object):
+    """
+    Chrome trace event file, in the JSON array format, to load in chrome://tracing or Perfetto.
+    Events are buffered and written flush_size at a time.
+    """
+    def __init__(self, path, flush_size=1000):
+        self._file = open(path, 'w')
+        self._file.write('[')
+        self._flush_size = flush_size
+        self._events = []
+        self._first = True
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._start = time.perf_counter()
+
+
+    def complete(self, name, start, end, args):
+        """
+        Event of a stage which ran from start to end, perf_counter times
+        """
+        self._add({'name': name, 'ph': 'X', 'pid': self._pid, 'tid': threading.get_native_id(),
+                   'ts': (start - self._start) * 1e6, 'dur': (end - start) * 1e6, 'args': args})
+
+
+    def thread_name(self, name):
+        self._add({'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': threading.get_native_id(),
+                   'args': {'name': name}})
+
+
+    def _add(self, event):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._events.append(event)
+            if len(self._events) >= self._flush_size:
+                self._flush()
+
+
+    def _flush(self):
+        if not self._events:
+            return
+        separator = '\n' if self._first else ',\n'
+        self._file.write(separator + ',\n'.join(json.dumps(event) for event in self._events))
+        self._first = False
+        self._events = []
+
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._file.write('\n]\n')
+            self._file.close()
+
+
+
+class Instrumentation(object):
+    """
+    Rolling histograms of the pipeline stages duration, in ms, and of other per frame measures.
+    Stages can be timed from any thread, and traced with the frame number the thread works on.
+    """
+    def __init__(self, size=256):
+        self._size = size
+        self.histograms = {}
+        self.trace = None
+        self._local = threading.local()
+
+
+    def start_trace(self, path):
+        self.trace = TraceWriter(path)
+        self.name_thread(threading.current_thread().name)
+
+
+    def stop_trace(self):
+        trace, self.trace = self.trace, None
+        if trace:
+            trace.close()
+
+
+    def name_thread(self, name):
+        if self.trace:
+            self.trace.thread_name(name)
+
+
+    def set_frame(self, frame):
+        """
+        Frame number the calling thread is working on, added to its trace events
+        """
+        self._local.frame = frame
+
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, RollingHistogram(self._size))
+        return histogram
+
+
+    def add(self, name, value):
+        self.histogram(name).add(value, time.perf_counter())
+
+
+    @contextmanager
+    def stage(self, name, **args):
+        """
+        Time the enclosed block, args are added to the trace event
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.histogram(name).add((end - start) * 1000., end)
+            trace = self.trace
+            if trace:
+                args['frame'] = getattr(self._local, 'frame', None)
+                trace.complete(name, start, end, args)
+
+
+    def rate(self, name, window=1.0):
+        if name not in self.histograms:
+            return 0.
+        return self.histograms[name].rate(time.perf_counter(), window)
+
+
+    def percentile(self, name, q):
+        if name not in self.histograms:
+            return float('nan')
+        return self.histograms[name].percentile(q)
+
+
+    def mean(self, name):
+        if name not in self.histograms:
+            return float('nan')
+        return self.histograms[name].mean()
+
+
+
+# Shared by the worker and the GUI threads
+instrumentation = Instrumentation()
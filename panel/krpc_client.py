@@ -1,35 +1,111 @@
-from PyQt5.QtCore import QTimer, pyqtSignal, pyqtSlot, QObject
+import time
+from enum import Enum
+from PyQt5.QtCore import QTimer, pyqtSignal, pyqtSlot, Qt
 import numpy as np
 import krpc
 
+from panel.instrumentation import instrumentation
+from panel.krpc_fleet import FleetStreams
+from panel.krpc_rails import RailsWatch
+from panel.krpc_state_vector import BodyFrames, StateVectorStreams
+from panel.krpc_streams import TelemetryStreams
+from panel.poll_scheduler import PollScheduler, TIER
 from panel.telemetry.telemetry import Telemetry
+from panel.telemetry_source import TelemetrySource
 
 
 
-class KrpcClient(QObject):
+class INGEST(Enum):
+    # One synchronous RPC per telemetry field each tick
+    POLL = 'poll'
+    # Streams registered once per vessel/orbit, no RPC each tick
+    STREAM = 'stream'
+    # Vessel position and velocity read each tick, the orbit is computed locally
+    STATE_POLL = 'state-poll'
+    # Position and velocity streams, the orbit is computed locally
+    STATE_STREAM = 'state-stream'
+
+
+
+class KrpcClient(TelemetrySource):
     ksp_connected = pyqtSignal()
     ksp_disconnected = pyqtSignal()
-    telemetry_updated = pyqtSignal(Telemetry)
 
-    def __init__(self, server_address, **kwargs):
+    def __init__(self, server_address, ingest=INGEST.STREAM, rpc_port=krpc.DEFAULT_RPC_PORT,
+                 stream_port=krpc.DEFAULT_STREAM_PORT, interval=25, adaptive=True, on_rails=False, fleet=False,
+                 **kwargs):
         super(KrpcClient, self).__init__(**kwargs)
 
         self.server_address = server_address
+        self.rpc_port = rpc_port
+        self.stream_port = stream_port
+        # Telemetry poll interval, in ms, the shortest one when adaptive
+        self.interval = interval
+        self.ingest = ingest
+        # Poll rate following the orbit, time warp and server latency, in the poll modes
+        self.adaptive = adaptive and ingest in (INGEST.POLL, INGEST.STATE_POLL)
+        self.poll_scheduler = PollScheduler(interval / 1000.)
+        # Propagate the orbit locally while coasting under time warp
+        self.on_rails = on_rails
+        # Also read the other vessels orbiting the active vessel body
+        self.fleet = fleet
 
         self.ksp_is_connected = False
         self.ksp_current_game_scene = None
         self.as_active_vessel = False
+        self._streams = None
+        self._frames = None
+        self._rails = None
+        self._fleet = None
+        self.fleet_conn = None
+        self._orbit = None
+        self._short_term_scheduler = None
+        self.rpc_count = 0
 
-        # initialize update timers
-        self._short_term_scheduler = QTimer()
+
+    @pyqtSlot()
+    def start(self):
+        TelemetrySource.start(self)
+        # Called once the client lives in its worker thread, so the timer
+        # and every RPC it triggers run in the worker event loop
+        self._short_term_scheduler = QTimer(self)
+        self._short_term_scheduler.setSingleShot(True)
+        self._short_term_scheduler.setTimerType(Qt.PreciseTimer)
         self._short_term_scheduler.timeout.connect(self.short_term_processing)
-        self._short_term_scheduler.start(int(0.25 * 100))
+        self._short_term_scheduler.start(self.interval)
+        self.connect_to_ksp()
+
+
+    @pyqtSlot()
+    def stop(self):
+        if self._short_term_scheduler:
+            self._short_term_scheduler.stop()
+        self.remove_streams()
+        if self.ksp_is_connected:
+            self.ksp_conn.close()
+            if self.fleet_conn:
+                self.fleet_conn.close()
+                self.fleet_conn = None
+            self.ksp_is_connected = False
+            self.ksp_disconnected.emit()
+        TelemetrySource.stop(self)
 
 
     @pyqtSlot()
     def connect_to_ksp(self):
         try:
-            self.ksp_conn = krpc.connect(address=self.server_address)
+            self.ksp_conn = krpc.connect(address=self.server_address, rpc_port=self.rpc_port,
+                                         stream_port=self.stream_port)
+            self._instrument_rpcs(self.ksp_conn)
+            if self.fleet:
+                # The fleet streams can not share a connection with the telemetry ones
+                self.fleet_conn = krpc.connect(address=self.server_address, rpc_port=self.rpc_port,
+                                               stream_port=self.stream_port)
+                self._instrument_rpcs(self.fleet_conn)
+            if self.ingest in (INGEST.STREAM, INGEST.STATE_STREAM) or self.on_rails:
+                self.ksp_current_game_scene = self.ksp_conn.add_stream(getattr, self.ksp_conn.krpc, 'current_game_scene')
+            else:
+                self.ksp_current_game_scene = lambda: self.ksp_conn.krpc.current_game_scene
             self.ksp_is_connected = True
             self.ksp_connected.emit()
             print('Connection Success')
@@ -39,11 +115,31 @@ class KrpcClient(QObject):
             return
 
 
+    def _instrument_rpcs(self, ksp_conn):
+        invoke = ksp_conn._invoke
+        def instrumented_invoke(service, procedure, *args, **kwargs):
+            self.rpc_count += 1
+            with instrumentation.stage('rpc', procedure='%s.%s' % (service, procedure)):
+                return invoke(service, procedure, *args, **kwargs)
+        ksp_conn._invoke = instrumented_invoke
+
+
     @pyqtSlot()
     def short_term_processing(self):
+        start = time.monotonic()
+        self.process()
+        # Scheduled from the tick start, a slow tick is not followed by a burst
+        if self.adaptive and self.as_active_vessel:
+            delay = self.poll_scheduler.delay(start, time.monotonic(), self.mailbox.pending)
+        else:
+            delay = max(0., start + self.interval / 1000. - time.monotonic())
+        self._short_term_scheduler.start(int(delay * 1000))
+
+
+    def process(self):
         if self.ksp_is_connected:
             # Check if the current game scene is a a Flight scene, continue processing
-            if self.ksp_conn.krpc.current_game_scene == self.ksp_conn.krpc.GameScene.flight:
+            if self.ksp_current_game_scene() == self.ksp_conn.krpc.GameScene.flight:
                 # set up telemetry for the vessel if it hasn't already been done
                 if not self.as_active_vessel:
                     self.init_telemetry()
@@ -52,14 +148,96 @@ class KrpcClient(QObject):
             else:
                 # otherwise, unset the active vessel and telemetry
                 self.as_active_vessel = False
+                self.remove_streams()
 
 
     def init_telemetry(self):
         self.space_center = self.ksp_conn.space_center
         self.as_active_vessel = True
         self.telemetry = Telemetry()
+        self._orbit = None
+        if self.ingest in (INGEST.STATE_POLL, INGEST.STATE_STREAM):
+            self._frames = BodyFrames(self.space_center)
+        if self.ingest == INGEST.STREAM:
+            self._streams = TelemetryStreams(self.ksp_conn)
+        elif self.ingest == INGEST.STATE_STREAM:
+            self._streams = StateVectorStreams(self.ksp_conn, self._frames)
+        if self.on_rails:
+            self._rails = RailsWatch(self.ksp_conn)
+        if self.fleet:
+            self._fleet = FleetStreams(self.fleet_conn)
 
 
     def update_telemetry(self):
-        self.telemetry.update_from_krpc_active_vessel(self.space_center.ut, self.space_center.active_vessel)
-        self.telemetry_updated.emit(self.telemetry)
+        if self.adaptive and self.mailbox.pending:
+            # Back-pressure, the renderer has not drawn the last snapshot yet
+            return
+        rpc_count = self.rpc_count
+        self.begin_frame()
+        with instrumentation.stage('worker'):
+            if self._rails and self._rails.on_rails():
+                self.telemetry.update_from_snapshot(self._rails.propagated())
+            else:
+                if self.adaptive:
+                    self.read_telemetry_tier()
+                else:
+                    self.read_telemetry()
+                if self._rails and self._rails.check(self.telemetry.snapshot()) and self._streams:
+                    # Orbit streams are bound again when leaving the rails
+                    self._streams.suspend()
+        instrumentation.add('rpc/frame', self.rpc_count - rpc_count)
+        self.publish(self.telemetry.snapshot())
+        # After the snapshot, the vessel RPCs do not delay it
+        if self._fleet:
+            rpc_count = self.rpc_count
+            with instrumentation.stage('fleet'):
+                fleet = self._fleet.update()
+            instrumentation.add('fleet rpc/frame', self.rpc_count - rpc_count)
+            if fleet is not None:
+                self.fleet_mailbox.put(fleet)
+
+
+    def read_telemetry_tier(self):
+        """
+        Read the tier due, the slow tier also update the poll rates
+        """
+        start = time.monotonic()
+        tier = self.poll_scheduler.tier(start)
+        if self.ingest == INGEST.POLL and self._orbit is None:
+            tier = TIER.SLOW
+        if self.ingest == INGEST.POLL and tier == TIER.FAST:
+            self.telemetry.update_from_krpc_fast(self.space_center.ut, self._orbit)
+        else:
+            # State vector reads are full reads, the slow tier only adds the time warp
+            if self.ingest == INGEST.POLL:
+                self._orbit = self.space_center.active_vessel.orbit
+            self.read_telemetry()
+        if tier == TIER.SLOW:
+            self.poll_scheduler.update_orbit(self.telemetry.mean_motion, self.space_center.warp_rate)
+        self.poll_scheduler.done(tier, start, time.monotonic())
+
+
+    def read_telemetry(self):
+        if self.ingest == INGEST.STREAM:
+            self._streams.update()
+            self.telemetry.update_from_krpc_streams(self._streams)
+        elif self.ingest == INGEST.STATE_STREAM:
+            self._streams.update()
+            self.telemetry.update_from_krpc_state_streams(self._streams)
+        elif self.ingest == INGEST.STATE_POLL:
+            self.telemetry.update_from_krpc_state_vector(self.space_center.ut, self.space_center.active_vessel,
+                                                         self._frames)
+        else:
+            self.telemetry.update_from_krpc_active_vessel(self.space_center.ut, self.space_center.active_vessel)
+
+
+    def remove_streams(self):
+        if self._streams:
+            self._streams.remove()
+        self._streams = None
+        if self._rails:
+            self._rails.remove()
+        self._rails = None
+        if self._fleet:
+            self._fleet.remove()
+        self._fleet = None
@@ -0,0 +1,162 @@
+import time
+from collections import deque
+import numpy as np
+from krpc.error import StreamError
+
+from panel.krpc_state_vector import BodyFrames
+from panel.planet_data import BODIES
+from panel.telemetry.fleet import fleet_from_state_vectors
+
+# s between two FleetSnapshots, the vessels are propagated locally in between
+FLEET_INTERVAL = 2.0
+# Vessels bound per telemetry tick, each one cost up to 9 RPCs
+FLEET_VESSELS_PER_TICK = 1
+
+
+
+class FleetVessel(object):
+    """
+    Streams of one of the other vessels: its body, and its position and velocity
+    in the non rotating frame of the active vessel body while it orbits that body.
+    """
+    def __init__(self, name, body):
+        self.name = name
+        self.body = body
+        self.position = None
+        self.velocity = None
+
+
+    def remove_state_streams(self):
+        for stream in (self.position, self.velocity):
+            if stream:
+                stream.remove()
+        self.position = None
+        self.velocity = None
+
+
+    def remove(self):
+        self.remove_state_streams()
+        self.body.remove()
+
+
+
+class FleetStreams(object):
+    """
+    The other vessels orbiting the active vessel reference body, read from streams.
+    Vessels are bound a few per tick, then reading them cost no RPC: each update
+    costs at most FLEET_VESSELS_PER_TICK vessels of RPCs, plus 4 RPCs every interval s
+    to follow the vessel list, the active vessel and its body.
+    ksp_conn must be a connection of its own: krpc shares identical streams within
+    a connection, removing a vessel stream would also remove the telemetry one.
+    """
+    def __init__(self, ksp_conn, interval=FLEET_INTERVAL, vessels_per_tick=FLEET_VESSELS_PER_TICK):
+        self._conn = ksp_conn
+        self._space_center = ksp_conn.space_center
+        self._frames = BodyFrames(self._space_center)
+        self.interval = interval
+        self.vessels_per_tick = vessels_per_tick
+        self.ut = ksp_conn.add_stream(getattr, self._space_center, 'ut')
+        # Every vessel, the active one included, its streams are only skipped
+        self.vessels = {}
+        self._active_vessel = None
+        # Vessels to bind, or whose state streams must follow a body change
+        self._pending = deque()
+        self._body = None
+        self._ref_body_name = None
+        self._reference_frame = None
+        self._matrix = None
+        self._read_time = None
+
+
+    def _add_stream(self, func, *args):
+        # Started without waiting for its first value, a stream without value is skipped
+        stream = self._conn.add_stream(func, *args)
+        stream.start(wait=False)
+        return stream
+
+
+    def update(self):
+        """
+        Bind pending vessels, return a FleetSnapshot every interval s, None otherwise
+        """
+        for _ in range(min(self.vessels_per_tick, len(self._pending))):
+            self._bind(self._pending.popleft())
+        now = time.monotonic()
+        if self._read_time is not None and now - self._read_time < self.interval:
+            return None
+        self._read_time = now
+        self._refresh()
+        return self._snapshot()
+
+
+    def _bind(self, vessel):
+        entry = self.vessels.get(vessel)
+        if entry is None:
+            orbit = vessel.orbit
+            entry = self.vessels[vessel] = FleetVessel(vessel.name, self._add_stream(getattr, orbit, 'body'))
+            body = orbit.body
+        else:
+            body = self._stream_value(entry.body)
+        if body == self._body and entry.position is None:
+            entry.position = self._add_stream(vessel.position, self._reference_frame)
+            entry.velocity = self._add_stream(vessel.velocity, self._reference_frame)
+        elif body != self._body:
+            entry.remove_state_streams()
+
+
+    def _refresh(self):
+        space_center = self._space_center
+        active_vessel = space_center.active_vessel
+        body = active_vessel.orbit.body
+        if body != self._body:
+            # State streams are in the frame of the former body
+            self._body = body
+            self._ref_body_name, self._reference_frame, self._matrix = self._frames.get(body)
+            for entry in self.vessels.values():
+                entry.remove_state_streams()
+        self._active_vessel = active_vessel
+        vessels = set(space_center.vessels)
+        for vessel in [vessel for vessel in self.vessels if vessel not in vessels]:
+            self.vessels.pop(vessel).remove()
+        self._pending = deque(vessel for vessel in self._pending if vessel in vessels)
+        pending = set(self._pending)
+        for vessel in vessels:
+            if vessel in pending:
+                continue
+            entry = self.vessels.get(vessel)
+            # New vessels, and vessels which entered or left the body SOI
+            if entry is None or (self._stream_value(entry.body) == body) != (entry.position is not None):
+                self._pending.append(vessel)
+
+
+    @staticmethod
+    def _stream_value(stream):
+        try:
+            return stream()
+        except StreamError:
+            return None
+
+
+    def _snapshot(self):
+        names, positions, velocities = [], [], []
+        for vessel, entry in self.vessels.items():
+            if entry.position is None or vessel == self._active_vessel:
+                continue
+            position = self._stream_value(entry.position)
+            velocity = self._stream_value(entry.velocity)
+            if position is None or velocity is None:
+                continue
+            names.append(entry.name)
+            positions.append(position)
+            velocities.append(velocity)
+        positions = np.matmul(np.reshape(positions, (-1, 3)), self._matrix.T)
+        velocities = np.matmul(np.reshape(velocities, (-1, 3)), self._matrix.T)
+        return fleet_from_state_vectors(self.ut(), BODIES.ids[self._ref_body_name], names, positions, velocities)
+
+
+    def remove(self):
+        for entry in self.vessels.values():
+            entry.remove()
+        self.vessels = {}
+        self._pending.clear()
+        self.ut.remove()
@@ -0,0 +1,104 @@
+from panel.telemetry.propagation import body_mu, propagate
+
+# Orbit elements compared to detect a constant orbit
+RAILS_ELEMENTS = (
+    'eccentricity',
+    'semi_major_axis',
+    'inclination',
+    'longitude_of_ascending_node',
+    'argument_of_periapsis',
+)
+
+# Relative change of an element still considered constant
+RAILS_TOLERANCE = 1e-6
+
+
+
+def same_orbit(a, b):
+    if a.ref_body_name != b.ref_body_name:
+        return False
+    for name in RAILS_ELEMENTS:
+        x, y = getattr(a, name), getattr(b, name)
+        if abs(x - y) > RAILS_TOLERANCE * max(1., abs(x)):
+            return False
+    return True
+
+
+
+class RailsWatch(object):
+    """
+    Tell when the active vessel coasts on rails: time warp on, no thrust and the
+    same orbit in two consecutive full reads. On rails, snapshots are propagated
+    from the last full read using only the ut stream, until the warp stops, the
+    vessel thrusts, the active vessel changes or the vessel leaves its SOI.
+    """
+    def __init__(self, ksp_conn):
+        self._conn = ksp_conn
+        space_center = ksp_conn.space_center
+        # krpc shares identical streams: ut and active_vessel may also be
+        # TelemetryStreams ones, both are only removed when telemetry stops
+        self.ut = ksp_conn.add_stream(getattr, space_center, 'ut')
+        self.active_vessel = ksp_conn.add_stream(getattr, space_center, 'active_vessel')
+        self.warp_rate = ksp_conn.add_stream(getattr, space_center, 'warp_rate')
+        self.vessel = None
+        self.thrust = None
+        self.snapshot = None
+        self.soi_change_ut = None
+        self._mu = None
+        self._previous = None
+
+
+    def _bind_vessel(self, vessel):
+        if self.thrust:
+            self.thrust.remove()
+        self.vessel = vessel
+        self.thrust = self._conn.add_stream(getattr, vessel, 'thrust')
+
+
+    def coasting(self):
+        vessel = self.active_vessel()
+        if vessel != self.vessel:
+            self._bind_vessel(vessel)
+            return False
+        return self.warp_rate() > 1 and self.thrust() == 0
+
+
+    def check(self, snapshot):
+        """
+        Called with each fully read snapshot, go on rails when coasting.
+        Return True when going on rails.
+        """
+        previous, self._previous = self._previous, snapshot
+        if previous is not None and same_orbit(previous, snapshot) and self.coasting():
+            # A body missing from BODIES is never propagated
+            self._mu = body_mu(snapshot.ref_body_name)
+            if self._mu is None:
+                return False
+            self.snapshot = snapshot
+            # nan when the orbit stays in the body SOI, the comparison is then always false
+            self.soi_change_ut = snapshot.ut + self.vessel.orbit.time_to_soi_change
+            return True
+        return False
+
+
+    def on_rails(self):
+        if self.snapshot is None:
+            return False
+        if self.coasting() and not self.ut() >= self.soi_change_ut:
+            return True
+        self.snapshot = None
+        self._previous = None
+        return False
+
+
+    def propagated(self):
+        return propagate(self.snapshot, self.ut(), self._mu)
+
+
+    def remove(self):
+        for stream in (self.ut, self.active_vessel, self.warp_rate, self.thrust):
+            if stream:
+                stream.remove()
+        self.thrust = None
+        self.vessel = None
+        self.snapshot = None
@@ -0,0 +1,60 @@
+import numpy as np
+
+from panel.krpc_streams import TelemetryStreams
+
+
+
+def reference_matrix(direction, normal):
+    """
+    Matrix from krpc left handed coordinates, y toward the north pole, to the
+    right handed frame the orbit is computed in: x along the reference
+    direction and z along the reference plane normal.
+    """
+    swap = np.array([[1., 0., 0.], [0., 0., 1.], [0., 1., 0.]])
+    x = np.matmul(swap, direction)
+    z = np.matmul(swap, normal)
+    return np.matmul(np.array([x, np.cross(z, x), z]), swap)
+
+
+
+class BodyFrames(object):
+    """
+    Name, non rotating reference frame and reference_matrix of each body,
+    read once per body.
+    """
+    def __init__(self, space_center):
+        self._space_center = space_center
+        self._frames = {}
+
+
+    def get(self, body):
+        frame = self._frames.get(body)
+        if frame is None:
+            reference_frame = body.non_rotating_reference_frame
+            orbit = self._space_center.Orbit
+            matrix = reference_matrix(orbit.reference_plane_direction(reference_frame),
+                                      orbit.reference_plane_normal(reference_frame))
+            frame = self._frames[body] = (body.name.lower(), reference_frame, matrix)
+        return frame
+
+
+
+class StateVectorStreams(TelemetryStreams):
+    """
+    Position and velocity streams of the active vessel, in the non rotating
+    frame of its reference body, instead of a stream per orbit value.
+    """
+    def __init__(self, ksp_conn, frames):
+        self.frames = frames
+        self.matrix = None
+        super(StateVectorStreams, self).__init__(ksp_conn)
+
+
+    def _bind_orbit(self, body):
+        self._remove_orbit_streams()
+        self._body = body
+        self.ref_body_name, reference_frame, self.matrix = self.frames.get(body)
+        self.orbit = {
+            'position': self._conn.add_stream(self.vessel.position, reference_frame),
+            'velocity': self._conn.add_stream(self.vessel.velocity, reference_frame),
+        }
@@ -0,0 +1,75 @@
+from panel.telemetry.telemetry import ORBIT_FIELDS
+
+
+
+class TelemetryStreams(object):
+    """
+    krpc streams for every value Telemetry needs.
+    Streams are bound once per vessel/orbit, reading them cost no RPC.
+    """
+    def __init__(self, ksp_conn):
+        self._conn = ksp_conn
+        self.ut = self._conn.add_stream(getattr, self._conn.space_center, 'ut')
+        self.active_vessel = self._conn.add_stream(getattr, self._conn.space_center, 'active_vessel')
+        self.vessel = None
+        self.orbit = {}
+        self.ref_body_name = None
+        self._body = None
+        self._body_stream = None
+
+
+    def update(self):
+        """
+        Rebind the streams if the active vessel or the reference body
+        changed since the last update.
+        """
+        vessel = self.active_vessel()
+        if vessel != self.vessel:
+            self._bind_vessel(vessel)
+        body = self._body_stream()
+        if body != self._body:
+            self._bind_orbit(body)
+
+
+    def _bind_vessel(self, vessel):
+        self._remove_vessel_streams()
+        self.vessel = vessel
+        self._body_stream = self._conn.add_stream(getattr, vessel.orbit, 'body')
+        self._bind_orbit(self._body_stream())
+
+
+    def _bind_orbit(self, body):
+        self._remove_orbit_streams()
+        self._orbit = self.vessel.orbit
+        self._body = body
+        self.ref_body_name = body.name.lower()
+        self.orbit = dict((name, self._conn.add_stream(getattr, self._orbit, name)) for name in ORBIT_FIELDS)
+
+
+    def suspend(self):
+        """
+        Remove the orbit streams, they are bound again on the next update.
+        """
+        self._remove_orbit_streams()
+
+
+    def _remove_orbit_streams(self):
+        for stream in self.orbit.values():
+            stream.remove()
+        self.orbit = {}
+        self._body = None
+        self.ref_body_name = None
+
+
+    def _remove_vessel_streams(self):
+        self._remove_orbit_streams()
+        if self._body_stream:
+            self._body_stream.remove()
+        self._body_stream = None
+        self.vessel = None
+
+
+    def remove(self):
+        self._remove_vessel_streams()
+        self.ut.remove()
+        self.active_vessel.remove()
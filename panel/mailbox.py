@@ -0,0 +1,61 @@
+import threading
+import time
+
+
+
+class LatestValueMailbox(object):
+    """
+    Single slot mailbox between a producer and a consumer thread.
+    A new value replaces the one not yet taken, so the consumer always gets
+    the newest value and a slow consumer never builds a backlog.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._has_value = False
+        self._put_time = None
+        self._sequence = None
+        # perf_counter time and put_count of the last taken value when it was put
+        self.taken_put_time = None
+        self.taken_sequence = None
+        self.put_count = 0
+        self.dropped_count = 0
+
+
+    def put(self, value):
+        """
+        Store value, dropping the pending one.
+        Return True if the mailbox was empty, the consumer must then be notified.
+        """
+        with self._lock:
+            was_empty = not self._has_value
+            if not was_empty:
+                self.dropped_count += 1
+            self._value = value
+            self._put_time = time.perf_counter()
+            self._has_value = True
+            self.put_count += 1
+            self._sequence = self.put_count
+        return was_empty
+
+
+    @property
+    def pending(self):
+        """
+        True while a value waits for the consumer
+        """
+        return self._has_value
+
+
+    def take(self):
+        """
+        Return the pending value and empty the mailbox, None if there is nothing new.
+        """
+        with self._lock:
+            value = self._value
+            if self._has_value:
+                self.taken_put_time = self._put_time
+                self.taken_sequence = self._sequence
+            self._value = None
+            self._has_value = False
+        return value
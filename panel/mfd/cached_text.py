@@ -0,0 +1,81 @@
+import numpy as np
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.font_manager import findfont, get_font
+from matplotlib.text import Text
+
+
+
+def line_offsets(text):
+    """
+    Return (line height, first line offset) of a top aligned multi-line matplotlib Text,
+    in points: line i is drawn as a single line text moved down by offset + i * height.
+    """
+    properties = text.get_fontproperties()
+    font = get_font(findfont(properties))
+    table = font.get_sfnt_table('OS/2')
+    if table:
+        line_gap, ascent, descent = table['sTypoLineGap'], table['sTypoAscender'], table['sTypoDescender']
+    else:
+        table = font.get_sfnt_table('hhea')
+        line_gap, ascent, descent = table['lineGap'], table['ascent'], table['descent']
+    scale = properties.get_size_in_points() / font.get_sfnt_table('head')['unitsPerEm']
+    linespacing = text.get_linespacing()
+    if linespacing == 'normal':
+        # The line gap is shared above and below every line, single line texts have none
+        return (ascent - descent + line_gap) * scale, line_gap * scale / 2
+    return linespacing * (ascent - descent) * scale, 0.
+
+
+
+class CachedText(Text):
+    """
+    Text rasterized once by Agg: its bitmap is copied on the canvas while the text,
+    its color, its position and the canvas size are unchanged.
+    Other renderers draw it as a plain Text.
+    """
+    # Transparent canvas the texts are rasterized on, shared by every CachedText
+    _scratch = None
+
+    def __init__(self, *args, **kwargs):
+        Text.__init__(self, *args, **kwargs)
+        self._bitmap_key = None
+        # (x, y, rgba image), x and y of the bottom left corner in pixels
+        self._bitmap = None
+
+
+    def draw(self, renderer):
+        if not isinstance(renderer, RendererAgg) or not self.get_visible() or not self.get_text():
+            Text.draw(self, renderer)
+            return
+        x, y = self.get_transform().transform(self.get_position())
+        key = (self.get_text(), self.get_color(), x, y, renderer.width, renderer.height, renderer.dpi)
+        if key != self._bitmap_key:
+            self._bitmap = self._rasterize(renderer)
+            self._bitmap_key = key
+        if self._bitmap:
+            gc = renderer.new_gc()
+            self._set_gc_clip(gc)
+            renderer.draw_image(gc, *self._bitmap)
+            gc.restore()
+        self.stale = False
+
+
+    def _rasterize(self, renderer):
+        scratch = CachedText._scratch
+        if scratch is None or (scratch.width, scratch.height, scratch.dpi) != (renderer.width, renderer.height, renderer.dpi):
+            scratch = CachedText._scratch = RendererAgg(renderer.width, renderer.height, renderer.dpi)
+        else:
+            scratch.clear()
+        Text.draw(self, scratch)
+        self._renderer = renderer
+
+        pixels = np.asarray(scratch.buffer_rgba())
+        alpha = pixels[:, :, 3]
+        rows = np.flatnonzero(alpha.any(axis=1))
+        if not len(rows):
+            return None
+        top, bottom = rows[0], rows[-1] + 1
+        columns = np.flatnonzero(alpha[top:bottom].any(axis=0))
+        left, right = columns[0], columns[-1] + 1
+        # draw_image takes the rows bottom up
+        return left, scratch.height - bottom, pixels[top:bottom, left:right][::-1].copy()
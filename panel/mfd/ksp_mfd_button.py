@@ -39,7 +39,7 @@ class KspMFDButton(QWidget):
         text, handler = self.mfd.get_button_info(button_name)
         button = QPushButton(text, self)
         button.setFixedSize(self._button_size, self._button_size)
-        button.move(x, y)
+        button.move(int(x), int(y))
         try:
             button.clicked.disconnect()
         except Exception:
@@ -2,9 +2,13 @@ from PyQt5.QtWidgets import QSizePolicy
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+from panel.instrumentation import instrumentation
+from panel.mfd.render_gate import RenderGate
+from panel.telemetry.telemetry import Telemetry
+
 
 class KspMFDFigure(FigureCanvas):
-    def __init__(self, parent=None, width=5, height=5, dpi=100):
+    def __init__(self, parent=None, width=5, height=5, dpi=100, blit=True, pixel_tolerance=0.5):
         fig = Figure(figsize=(width, height), dpi=dpi, facecolor='black')
 
         self.axes = fig.add_subplot(111)
@@ -19,16 +23,112 @@ class KspMFDFigure(FigureCanvas):
         FigureCanvas.updateGeometry(self)
 
         self.ksp_disconnect = True
+        # Owned by the GUI thread, refreshed from each received snapshot
+        self.telemetry = Telemetry()
+
+        # Blitting: static artists are kept in a cached background,
+        # only the animated artists are drawn on top of it each frame
+        self.blit_enabled = blit
+        self._background = None
+        self._background_view = None
+        # The last draw no longer match the static content
+        self._stale = True
+        self.full_draw_count = 0
+        self.blit_count = 0
+        self.mpl_connect('draw_event', self._on_draw_event)
+
+        # Skip frames which would not visibly change the MFD
+        self.render_gate = RenderGate(pixel_tolerance)
 
 
-    def update_mfd(self, telemetry):
+    def update_mfd(self, snapshot):
         """if not ksp_conn:
             self.error_text("ERR: NO CONNECTION")
         elif not ksp_conn.active_vessel:
             self.error_text('ERR: NO DATA')
         else:"""
-        self._update_mfd_data(telemetry)
-        self.draw()
+        with instrumentation.stage('frame'):
+            self._update_mfd(snapshot)
+
+
+    def _update_mfd(self, snapshot):
+        with instrumentation.stage('update'):
+            self.telemetry.update_from_snapshot(snapshot)
+        with instrumentation.stage('orbital'):
+            self._update_mfd_data(self.telemetry)
+        for artist in self._animated_artists():
+            artist.set_animated(self.blit_enabled)
+
+        static_changed, animated_changed = self.render_gate.update(self.axes.transData, *self._frame_geometry())
+        if static_changed or (self.blit_enabled and self._view() != self._background_view):
+            self.invalidate_background()
+
+        if not self._stale and not animated_changed:
+            self.render_gate.skipped()
+            return
+        full = self._stale or not self.blit_enabled
+        with instrumentation.stage('draw'):
+            if full:
+                self.full_draw_count += 1
+                self.draw()
+            else:
+                self.blit_count += 1
+                self.restore_region(self._background)
+                self._draw_animated_artists()
+                self.blit(self.figure.bbox)
+        self.render_gate.drawn(full)
+
+
+    def _animated_artists(self):
+        """
+        Artists which change every frame, drawn over the cached background
+        """
+        return []
+
+
+    def _frame_geometry(self):
+        """
+        Return (static points, animated points, animated texts) of the frame,
+        points in data coordinates with shape (n, 2)
+        """
+        return (), (), ()
+
+
+    def _view(self):
+        return tuple(self.axes.viewLim.bounds)
+
+
+    def _draw_animated_artists(self):
+        for artist in self._animated_artists():
+            self.figure.draw_artist(artist)
+
+
+    def _on_draw_event(self, event):
+        self._stale = False
+        # A full draw just rendered the static artists: keep them as background
+        if not self.blit_enabled:
+            return
+        self._background = self.copy_from_bbox(self.figure.bbox)
+        self._background_view = self._view()
+        self._draw_animated_artists()
+
+
+    def invalidate_background(self):
+        """
+        Static content changed, the next frame will be a full draw
+        """
+        self._background = None
+        self._stale = True
+
+
+    def paintEvent(self, event):
+        with instrumentation.stage('paint'):
+            FigureCanvas.paintEvent(self, event)
+
+
+    def resizeEvent(self, event):
+        self.invalidate_background()
+        FigureCanvas.resizeEvent(self, event)
 
 
     def _update_mfd_data(self, telemetry):
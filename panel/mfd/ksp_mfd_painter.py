@@ -0,0 +1,257 @@
+from collections import namedtuple
+import numpy as np
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QPainter, QTransform
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+from panel.instrumentation import instrumentation
+from panel.mfd.render_gate import RenderGate
+from panel.telemetry.telemetry import Telemetry
+
+Bbox = namedtuple('Bbox', ('width', 'height'))
+
+# matplotlib Text line spacing, in font size
+LINE_SPACING = 1.2
+
+
+
+class PainterText(object):
+    """
+    Text drawn by KspMFDPainter, positioned in axes coordinates like a matplotlib Text
+    with transform=axes.transAxes. Sizes are in points at the canvas dpi.
+    """
+    def __init__(self, axes, x, y, text, color='black', verticalalignment='baseline',
+                 horizontalalignment='left', family=None, fontsize=10, transform=None):
+        self._axes = axes
+        self._x = x
+        self._y = y
+        self._text = text
+        self._lines = text.split('\n')
+        self._color = QColor(color)
+        self._verticalalignment = verticalalignment
+        self._horizontalalignment = horizontalalignment
+        self._font = QFont('DejaVu Sans Mono' if family == 'monospace' else 'DejaVu Sans')
+        self._font.setStyleHint(QFont.Monospace if family == 'monospace' else QFont.SansSerif)
+        self._font.setPixelSize(max(1, int(round(fontsize * axes.dpi / 72.))))
+        self._metrics = QFontMetricsF(self._font)
+
+
+    def get_text(self):
+        return self._text
+
+
+    def set_text(self, text):
+        if text != self._text:
+            self._text = text
+            self._lines = text.split('\n')
+
+
+    def remove(self):
+        self._axes.texts.remove(self)
+
+
+    def paint(self, painter, width, height):
+        painter.setFont(self._font)
+        painter.setPen(self._color)
+        line_height = self._font.pixelSize() * LINE_SPACING
+        x = self._x * width
+        y = (1 - self._y) * height
+        if self._verticalalignment == 'top':
+            baseline = y + self._metrics.ascent()
+        elif self._verticalalignment == 'bottom':
+            baseline = y - self._metrics.descent() - (len(self._lines) - 1) * line_height
+        elif self._verticalalignment == 'center':
+            baseline = y + self._metrics.ascent() - (self._metrics.height() + (len(self._lines) - 1) * line_height) / 2
+        else:
+            baseline = y
+        for line in self._lines:
+            line_x = x
+            if self._horizontalalignment != 'left':
+                line_width = self._metrics.horizontalAdvance(line)
+                line_x -= line_width if self._horizontalalignment == 'right' else line_width / 2
+            painter.drawText(QPointF(line_x, baseline), line)
+            baseline += line_height
+
+
+
+class PainterDataTransform(object):
+    """
+    Data to pixel coordinates of a PainterAxes, y pointing down
+    """
+    def __init__(self, axes):
+        self._axes = axes
+
+
+    def qtransform(self):
+        xmin, xmax, ymin, ymax = self._axes.limits
+        scale_x = self._axes.bbox.width / (xmax - xmin)
+        scale_y = self._axes.bbox.height / (ymax - ymin)
+        return QTransform(scale_x, 0, 0, -scale_y, -xmin * scale_x, ymax * scale_y)
+
+
+    def transform(self, points):
+        """
+        points: array of shape (n, 2)
+        """
+        xmin, xmax, ymin, ymax = self._axes.limits
+        points = np.asarray(points, dtype=float)
+        pixels = np.empty_like(points)
+        pixels[:, 0] = (points[:, 0] - xmin) * (self._axes.bbox.width / (xmax - xmin))
+        pixels[:, 1] = (ymax - points[:, 1]) * (self._axes.bbox.height / (ymax - ymin))
+        return pixels
+
+
+
+class PainterAxes(object):
+    """
+    Data limits and texts of a KspMFDPainter, with the part of the matplotlib Axes
+    interface ViewLimits, RenderGate and the MFD texts use.
+    """
+    transAxes = 'axes'
+
+    def __init__(self, dpi=100):
+        self.dpi = dpi
+        self.bbox = Bbox(1, 1)
+        self.limits = (-1., 1., -1., 1.)
+        self.texts = []
+        self.transData = PainterDataTransform(self)
+
+
+    def set_autoscale_on(self, on):
+        pass
+
+
+    def set_xlim(self, xmin, xmax):
+        self.limits = (xmin, xmax) + self.limits[2:]
+
+
+    def set_ylim(self, ymin, ymax):
+        self.limits = self.limits[:2] + (ymin, ymax)
+
+
+    def text(self, x, y, text, **kwargs):
+        text = PainterText(self, x, y, text, **kwargs)
+        self.texts.append(text)
+        return text
+
+
+
+class KspMFDPainter(QWidget):
+    """
+    KspMFDFigure drawn directly with QPainter instead of matplotlib.
+    The whole MFD is painted on each drawn frame, frames the render gate
+    finds unchanged are skipped.
+    """
+    def __init__(self, parent=None, width=5, height=5, dpi=100, pixel_tolerance=0.5):
+        QWidget.__init__(self, parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.resize(int(width * dpi), int(height * dpi))
+
+        self.axes = PainterAxes(dpi)
+        self.axes.bbox = Bbox(self.width(), self.height())
+
+        self.ksp_disconnect = True
+        # Owned by the GUI thread, refreshed from each received snapshot
+        self.telemetry = Telemetry()
+        # The last paint no longer match the content
+        self._stale = True
+        self.full_draw_count = 0
+
+        # Skip frames which would not visibly change the MFD
+        self.render_gate = RenderGate(pixel_tolerance)
+
+
+    def update_mfd(self, snapshot):
+        with instrumentation.stage('frame'):
+            self._update_mfd(snapshot)
+
+
+    def _update_mfd(self, snapshot):
+        with instrumentation.stage('update'):
+            self.telemetry.update_from_snapshot(snapshot)
+        with instrumentation.stage('orbital'):
+            self._update_mfd_data(self.telemetry)
+
+        static_changed, animated_changed = self.render_gate.update(self.axes.transData, *self._frame_geometry())
+        if not self._stale and not static_changed and not animated_changed:
+            self.render_gate.skipped()
+            return
+        with instrumentation.stage('draw'):
+            self.draw()
+        self.render_gate.drawn(True)
+
+
+    def _frame_geometry(self):
+        """
+        Return (static points, animated points, animated texts) of the frame,
+        points in data coordinates with shape (n, 2)
+        """
+        return (), (), ()
+
+
+    def draw(self):
+        self.full_draw_count += 1
+        self.repaint()
+
+
+    def invalidate_background(self):
+        """
+        Content changed outside of the frame geometry, the next frame is drawn
+        """
+        self._stale = True
+
+
+    def paintEvent(self, event):
+        with instrumentation.stage('paint'):
+            painter = QPainter(self)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setRenderHint(QPainter.TextAntialiasing)
+            painter.fillRect(self.rect(), Qt.black)
+            self._paint(painter, self.axes.transData.qtransform())
+            width, height = self.width(), self.height()
+            for text in self.axes.texts:
+                text.paint(painter, width, height)
+            painter.end()
+        self._stale = False
+
+
+    def _paint(self, painter, transform):
+        """
+        Paint the MFD content, transform maps data to pixel coordinates
+        """
+        pass
+
+
+    def resizeEvent(self, event):
+        self.axes.bbox = Bbox(max(1, self.width()), max(1, self.height()))
+        self.invalidate_background()
+        QWidget.resizeEvent(self, event)
+
+
+    def _update_mfd_data(self, telemetry):
+        pass
+
+
+    def disconnect(self):
+        self.ksp_disconnect = True
+
+
+    def connect(self):
+        self.ksp_disconnect = False
+
+
+    def error_text(self, text):
+        self.axes.text(0.5, 0.5, text,
+                       horizontalalignment='center',
+                       verticalalignment='center',
+                       transform=self.axes.transAxes,
+                       family='monospace',
+                       color='red')
+
+
+    def get_button_info(self, button_name):
+        info = self._buttons.get(button_name)
+        if not info:
+            return '', None
+        return info['text'], getattr(self, info['handler'])
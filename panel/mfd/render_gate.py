@@ -0,0 +1,67 @@
+import numpy as np
+
+
+
+class RenderGate(object):
+    """
+    Compare the geometry of a new frame, in pixels, with what is on screen.
+    Static geometry is compared with the last full draw, animated geometry
+    and texts with the last draw of any kind. A move under pixel_tolerance
+    is not a change.
+    """
+    def __init__(self, pixel_tolerance=0.5):
+        self.pixel_tolerance = pixel_tolerance
+        self._drawn_static = None
+        self._drawn_animated = None
+        self._drawn_texts = None
+        self._pending = None
+        self.reset_stats()
+
+
+    def reset_stats(self):
+        self.frame_count = 0
+        self.skip_count = 0
+
+
+    @property
+    def skip_rate(self):
+        if not self.frame_count:
+            return 0.0
+        return float(self.skip_count) / self.frame_count
+
+
+    def _changed(self, points, drawn_points):
+        if drawn_points is None or points.shape != drawn_points.shape:
+            return True
+        return not np.allclose(points, drawn_points, rtol=0, atol=self.pixel_tolerance, equal_nan=True)
+
+
+    def update(self, transform, static_points, animated_points, texts):
+        """
+        points: data coordinates of shape (n, 2), transform: data to pixels transform
+        Return (static changed, animated changed)
+        """
+        static_points = transform.transform(static_points) if len(static_points) else np.empty((0, 2))
+        animated_points = transform.transform(animated_points) if len(animated_points) else np.empty((0, 2))
+        texts = tuple(texts)
+        self._pending = (static_points, animated_points, texts)
+        self.frame_count += 1
+        static_changed = self._changed(static_points, self._drawn_static)
+        animated_changed = texts != self._drawn_texts or self._changed(animated_points, self._drawn_animated)
+        return static_changed, animated_changed
+
+
+    def drawn(self, full):
+        static_points, self._drawn_animated, self._drawn_texts = self._pending
+        if full:
+            self._drawn_static = static_points
+
+
+    def skipped(self):
+        self.skip_count += 1
+
+
+    def reset(self):
+        self._drawn_static = None
+        self._drawn_animated = None
+        self._drawn_texts = None
@@ -0,0 +1,84 @@
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.transforms import IdentityTransform
+
+from panel.orbital.orbital_point import marker_path
+from panel.telemetry.fleet import FleetGeometry, FLEET_SAMPLES
+
+# Vessel marker diameter and orbit line width, in points
+FLEET_MARKER_SIZE = 4
+FLEET_LINE_WIDTH = 0.5
+
+
+
+class FleetPlot(object):
+    """
+    Orbits of the other vessels around the reference body, drawn by one LineCollection,
+    and their positions, drawn by one PathCollection.
+    Orbits only move with the active vessel orbit, positions every frame.
+    """
+    def __init__(self, axes, color='silver', orbit_color='dimgrey'):
+        self._axes = axes
+        self._color = color
+        self._orbit_color = orbit_color
+        self.geometry = None
+        self._matrix = None
+        self._orbits = None
+        self._positions = None
+        # Projected vessel positions, shape (n, 2), None when nothing is drawn
+        self.positions = None
+        # Projected apsides and quarter points of each orbit, shape (n * 5, 2): the orbits
+        # are static artists, the render gate redraws them when these points move
+        self.orbit_points = None
+
+
+    def set_fleet(self, fleet):
+        self.geometry = FleetGeometry(fleet) if fleet.names else None
+        self._matrix = None
+
+
+    def update(self, telemetry):
+        geometry = self.geometry
+        if geometry is None or geometry.fleet.ref_body_id != telemetry.ref_body_id:
+            self.remove()
+            return
+        matrix = telemetry.display_matrix
+        if matrix is not self._matrix:
+            self._matrix = matrix
+            orbits = geometry.project(matrix, geometry.curves)
+            self.orbit_points = orbits[:, ::(FLEET_SAMPLES - 1) // 4].reshape(-1, 2)
+            if not self._orbits:
+                # Under the reference body outline
+                self._orbits = LineCollection(orbits, colors=self._orbit_color, linewidths=FLEET_LINE_WIDTH,
+                                              zorder=0.5)
+                self._axes.add_collection(self._orbits, autolim=False)
+            else:
+                self._orbits.set_segments(orbits)
+        self.positions = geometry.project(matrix, geometry.positions(telemetry.ut))
+        if not self._positions:
+            self._positions = PathCollection([marker_path('o')], sizes=[FLEET_MARKER_SIZE ** 2],
+                                             offsets=self.positions, offset_transform=self._axes.transData,
+                                             facecolors=self._color, edgecolors='none', zorder=2)
+            # Marker paths are in points, only their offsets are in data coordinates
+            self._positions.set_transform(IdentityTransform())
+            self._axes.add_collection(self._positions, autolim=False)
+        else:
+            self._positions.set_offsets(self.positions)
+
+
+    @property
+    def artist(self):
+        """
+        The vessel positions collection, animated
+        """
+        return self._positions
+
+
+    def remove(self):
+        for collection in (self._orbits, self._positions):
+            if collection:
+                collection.remove()
+        self._orbits = None
+        self._positions = None
+        self._matrix = None
+        self.positions = None
+        self.orbit_points = None
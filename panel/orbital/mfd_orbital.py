@@ -1,10 +1,14 @@
 from enum import Flag, auto
+import numpy as np
+from panel.instrumentation import instrumentation
 from panel.mfd.ksp_mfd_figure import KspMFDFigure
+from panel.orbital.fleet_plot import FleetPlot
 from panel.orbital.ref_planet_plot import RefPlanetPlot
 from panel.orbital.orbit_hyperbole import OrbitHyperbole
 from panel.orbital.orbit_ellipse import OrbitEllipse
 from panel.telemetry.telemetry import PROJECTION
-from panel.orbital.orbital_text import ProjectionText, ShipOrbitalText
+from panel.orbital.orbital_text import ProjectionText, ShipOrbitalText, StatsText
+from panel.orbital.view_limits import ViewLimits
 
 
 class DISPLAY(Flag):
@@ -14,7 +18,8 @@ class DISPLAY(Flag):
 
     def next(self):
         cls = self.__class__
-        members = list(cls)
+        # list(cls) skips combined flags like ALL since python 3.11
+        members = list(cls.__members__.values())
         index = members.index(self) + 1
         if index >= len(members):
             index = 0
@@ -36,30 +41,49 @@ class MFDOrbital(KspMFDFigure):
             'text': 'PRJ',
             'handler': 'handler_toggle_projection_mode'
         },
+        'R1': {
+            'text': 'PRF',
+            'handler': 'handler_toggle_stats'
+        },
     }
 
 
-    def __init__(self, parent=None, width=5, height=5, dpi=100):
-        KspMFDFigure.__init__(self, parent, width, height, dpi)
+    # The background is redrawn when one of these fields changes,
+    # orbit changes are detected in pixels by the render gate
+    _static_fields = ('ref_body_name', 'projection_mode')
+
+    def __init__(self, parent=None, width=5, height=5, dpi=100, blit=True, pixel_tolerance=0.5):
+        KspMFDFigure.__init__(self, parent, width, height, dpi, blit, pixel_tolerance)
         self.display_mode = DISPLAY.ALL
         self.projection_mode = PROJECTION.SHIP
         self.show_legend = True
         self.show_orbit = True
+        self.show_stats = False
         self.current_active_vessel_id = None
         self.ref_planet_plot = RefPlanetPlot(self.axes)
         self.ellipse_orbit_plot = OrbitEllipse(self.axes)
         self.hyperbole_orbit_plot = OrbitHyperbole(self.axes)
+        self.fleet_plot = FleetPlot(self.axes)
         self.ship_text = ShipOrbitalText(self.axes, 0.05, 0.95, color='green', verticalalignment='top',
                                          transform=self.axes.transAxes, family='monospace', fontsize=14)
         self.projection_text = ProjectionText(self.axes, 0.85, 0.95, color='grey',
                                               transform=self.axes.transAxes, fontsize=14)
+        self.stats_text = StatsText(self.axes, 0.05, 0.02, color='yellow', verticalalignment='bottom',
+                                    transform=self.axes.transAxes, family='monospace', fontsize=9)
+        self._static_values = None
+        self.view_limits = ViewLimits(self.axes)
 
 
     def _update_mfd_data(self, telemetry):
         telemetry.projection_mode = self.projection_mode
+        static_values = [getattr(telemetry, name) for name in self._static_fields]
+        if static_values != self._static_values:
+            self._static_values = static_values
+            self.invalidate_background()
         if DISPLAY.ORBIT in self.display_mode:
             self.ref_planet_plot.update_ref_planet(telemetry)
             self.draw_vessel_orbit(telemetry)
+            self.fleet_plot.update(telemetry)
         else:
             self.remove_orbit_display()
         if DISPLAY.LEGEND in self.display_mode:
@@ -67,9 +91,55 @@ class MFDOrbital(KspMFDFigure):
             self.projection_text.update_text(self.projection_mode)
         else:
             self.remove_text()
-        self.axes.axis('auto')
-        self.axes.set_aspect('equal', adjustable='datalim')
-        self.axes.relim()
+        if self.show_stats:
+            self.stats_text.update_text(instrumentation)
+        if DISPLAY.ORBIT in self.display_mode:
+            self.view_limits.update(telemetry.ref_body_id, self._orbit_bounds())
+
+
+    def _orbit_bounds(self):
+        return self.ellipse_orbit_plot.bounds or self.hyperbole_orbit_plot.bounds
+
+
+    def _frame_geometry(self):
+        telemetry = self.telemetry
+        static_points = []
+        animated_points = []
+        bounds = self._orbit_bounds()
+        if bounds:
+            x = [telemetry.periapsis_x, telemetry.ascending_node_x, telemetry.descending_node_x]
+            y = [telemetry.periapsis_y, telemetry.ascending_node_y, telemetry.descending_node_y]
+            if telemetry.apoapsis_x is not None:
+                x.append(telemetry.apoapsis_x)
+                y.append(telemetry.apoapsis_y)
+            markers = telemetry.project_points(np.array([x, y], dtype=float))
+            # Bounds are already projected
+            corners = np.array([[bounds[0], bounds[1]], [bounds[2], bounds[3]]])
+            static_points = np.concatenate((markers, corners), axis=1).T
+            animated_points = telemetry.project_points(
+                np.array([[telemetry.vessel_x], [telemetry.vessel_y]], dtype=float)).T
+            if self.fleet_plot and self.fleet_plot.positions is not None:
+                static_points = np.concatenate((static_points, self.fleet_plot.orbit_points))
+                animated_points = np.concatenate((animated_points, self.fleet_plot.positions))
+        texts = [text.get_text() for text in (self.ship_text, self.stats_text) if text.artists]
+        return static_points, animated_points, texts
+
+
+    def _animated_artists(self):
+        # The vessel line shares its collection with the node line
+        artists = [self.ellipse_orbit_plot.points.lines_plot._collection,
+                   self.hyperbole_orbit_plot.points.lines_plot._collection,
+                   self.stats_text._text,
+                   self.fleet_plot.artist]
+        return [artist for artist in artists if artist] + self.ship_text.artists
+
+
+    def update_fleet(self, fleet):
+        """
+        Draw the vessels of a FleetSnapshot from the next frame
+        """
+        self.fleet_plot.set_fleet(fleet)
+        self.invalidate_background()
 
 
     def draw_vessel_orbit(self, telemetry):
@@ -104,6 +174,7 @@ class MFDOrbital(KspMFDFigure):
         self.ref_planet_plot.remove()
         self.ellipse_orbit_plot.remove()
         self.hyperbole_orbit_plot.remove()
+        self.fleet_plot.remove()
         self.remove_parabole_orbit()
 
 
@@ -117,6 +188,14 @@ class MFDOrbital(KspMFDFigure):
 
     def handler_toggle_display_mode(self):
         self.display_mode = self.display_mode.next()
+        self.invalidate_background()
+
+
+    def handler_toggle_stats(self):
+        self.show_stats = not self.show_stats
+        if not self.show_stats:
+            self.stats_text.remove()
+            self.invalidate_background()
 
 
     def handler_toggle_projection_mode(self):
@@ -0,0 +1,126 @@
+from panel.instrumentation import instrumentation
+from panel.mfd.ksp_mfd_painter import KspMFDPainter
+from panel.orbital.mfd_orbital import DISPLAY, MFDOrbital
+from panel.orbital.orbit_painter import PainterRefPlanet, PainterOrbitEllipse, PainterOrbitHyperbole
+from panel.orbital.orbital_text import OrbitPointText, ProjectionText, ShipOrbitalText, StatsText
+from panel.orbital.view_limits import ViewLimits
+from panel.telemetry.telemetry import PROJECTION
+
+
+
+class PainterShipOrbitalText(OrbitPointText):
+    """
+    ShipOrbitalText as a single PainterText, Qt caches the glyphs itself
+    """
+    def update_text(self, telemetry):
+        OrbitPointText.update_text(self, '\n'.join(ShipOrbitalText.lines(telemetry)))
+
+
+
+class MFDOrbitalPainter(KspMFDPainter):
+    """
+    MFDOrbital painted with QPainter: same content, buttons and texts.
+    """
+    _buttons = MFDOrbital._buttons
+    _static_fields = MFDOrbital._static_fields
+
+    def __init__(self, parent=None, width=5, height=5, dpi=100, pixel_tolerance=0.5):
+        KspMFDPainter.__init__(self, parent, width, height, dpi, pixel_tolerance)
+        self.display_mode = DISPLAY.ALL
+        self.projection_mode = PROJECTION.SHIP
+        self.show_stats = False
+        self.ref_planet_plot = PainterRefPlanet(dpi)
+        self.ellipse_orbit_plot = PainterOrbitEllipse(dpi)
+        self.hyperbole_orbit_plot = PainterOrbitHyperbole(dpi)
+        # The other vessels are only drawn by MFDOrbital
+        self.fleet_plot = None
+        self.ship_text = PainterShipOrbitalText(self.axes, 0.05, 0.95, color='green', verticalalignment='top',
+                                                transform=self.axes.transAxes, family='monospace', fontsize=14)
+        self.projection_text = ProjectionText(self.axes, 0.85, 0.95, color='grey',
+                                              transform=self.axes.transAxes, fontsize=14)
+        self.stats_text = StatsText(self.axes, 0.05, 0.02, color='yellow', verticalalignment='bottom',
+                                    transform=self.axes.transAxes, family='monospace', fontsize=9)
+        self._static_values = None
+        self.view_limits = ViewLimits(self.axes)
+
+
+    def _update_mfd_data(self, telemetry):
+        telemetry.projection_mode = self.projection_mode
+        static_values = [getattr(telemetry, name) for name in self._static_fields]
+        if static_values != self._static_values:
+            self._static_values = static_values
+            self.invalidate_background()
+        if DISPLAY.ORBIT in self.display_mode:
+            self.ref_planet_plot.update_ref_planet(telemetry)
+            self.draw_vessel_orbit(telemetry)
+        else:
+            self.remove_orbit_display()
+        if DISPLAY.LEGEND in self.display_mode:
+            self.ship_text.update_text(telemetry)
+            self.projection_text.update_text(self.projection_mode)
+        else:
+            self.remove_text()
+        if self.show_stats:
+            self.stats_text.update_text(instrumentation)
+        if DISPLAY.ORBIT in self.display_mode:
+            self.view_limits.update(telemetry.ref_body_id, self._orbit_bounds())
+
+
+    def _orbit_bounds(self):
+        return self.ellipse_orbit_plot.bounds or self.hyperbole_orbit_plot.bounds
+
+
+    def _frame_geometry(self):
+        return MFDOrbital._frame_geometry(self)
+
+
+    def _paint(self, painter, transform):
+        self.ref_planet_plot.paint(painter, transform)
+        if self.ellipse_orbit_plot.bounds:
+            self.ellipse_orbit_plot.paint(painter, transform)
+        if self.hyperbole_orbit_plot.bounds:
+            self.hyperbole_orbit_plot.paint(painter, transform)
+
+
+    def update_fleet(self, fleet):
+        pass
+
+
+    def draw_vessel_orbit(self, telemetry):
+        if telemetry.eccentricity < 1:
+            self.hyperbole_orbit_plot.remove()
+            self.ellipse_orbit_plot.update_orbit(telemetry)
+        elif telemetry.eccentricity > 1:
+            self.ellipse_orbit_plot.remove()
+            self.hyperbole_orbit_plot.update_orbit(telemetry)
+
+
+    def remove_text(self):
+        self.ship_text.remove()
+        self.projection_text.remove()
+
+
+    def remove_orbit_display(self):
+        self.ref_planet_plot.remove()
+        self.ellipse_orbit_plot.remove()
+        self.hyperbole_orbit_plot.remove()
+
+
+    def handler_toggle_distance_unit(self):
+        pass
+
+
+    def handler_toggle_display_mode(self):
+        self.display_mode = self.display_mode.next()
+        self.invalidate_background()
+
+
+    def handler_toggle_stats(self):
+        self.show_stats = not self.show_stats
+        if not self.show_stats:
+            self.stats_text.remove()
+            self.invalidate_background()
+
+
+    def handler_toggle_projection_mode(self):
+        self.projection_mode = self.projection_mode.next()
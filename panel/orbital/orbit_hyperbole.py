@@ -1,17 +1,13 @@
 
 from panel.orbital.orbit_plot import OrbitPlot
+from panel.orbital.orbital_point import PeriapsisPoint, AscendingPoint, DescendingPoint
 from panel.orbital.orbital_points_plot import OrbitalPointsPlot
 from panel.orbital.trajectory_hyperbole import TrajectoryHyperbole
 from panel.telemetry.hyperbole import HyperboleData
 
 
 class OrbitalPointsHyperbole(OrbitalPointsPlot):
-    def update(self, telemetry):
-        self.periapsis_plot.update_plot(telemetry)
-        self.ascending_plot.update_plot(telemetry)
-        self.descending_plot.update_plot(telemetry)
-        self.ascending_descending.update_plot(telemetry)
-        self.vessel_plot.update_plot(telemetry)
+    points = (PeriapsisPoint(), AscendingPoint(), DescendingPoint())
 
 
 
@@ -0,0 +1,199 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QColor, QPainterPath, QPen, QPolygonF, QTransform
+
+from panel.orbital.orbit_plot import OrbitPlot
+from panel.planet_data import BODIES
+from panel.telemetry.ellipse import EllipseData
+from panel.telemetry.hyperbole import HyperboleData
+
+GREEN = QColor('green')
+GREY = QColor('grey')
+BLACK = QColor('black')
+
+
+
+def points_to_pixels(points, dpi):
+    """
+    matplotlib sizes are in points
+    """
+    return points * dpi / 72.
+
+
+def cosmetic_pen(color, width, style=Qt.SolidLine):
+    """
+    Pen of width pixels whatever the painter transform
+    """
+    pen = QPen(color, width, style)
+    pen.setCosmetic(True)
+    return pen
+
+
+def projection_transform(telemetry):
+    """
+    QTransform of the telemetry projection matrix, from orbit plane to data coordinates
+    """
+    matrix = telemetry.projection_matrix
+    return QTransform(matrix[0, 0], matrix[1, 0], matrix[0, 1], matrix[1, 1], 0, 0)
+
+
+
+class PainterRefPlanet(object):
+    def __init__(self, dpi):
+        self._pen = cosmetic_pen(GREY, points_to_pixels(1., dpi))
+        self._ref_planet_name = None
+        self._path = None
+
+
+    def update_ref_planet(self, telemetry):
+        if self._ref_planet_name == telemetry.ref_body_name:
+            return
+        self._ref_planet_name = telemetry.ref_body_name
+        radius = BODIES.body(self._ref_planet_name).radius
+        self._path = QPainterPath()
+        self._path.addEllipse(QPointF(0, 0), radius, radius)
+
+
+    def paint(self, painter, transform):
+        if self._path is None:
+            return
+        painter.setTransform(transform)
+        painter.setPen(self._pen)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(self._path)
+        painter.resetTransform()
+
+
+    def remove(self):
+        self._ref_planet_name = None
+        self._path = None
+
+
+
+class PainterTrajectoryEllipse(object):
+    """
+    Ellipse path in the orbit plane, periapsis along x, built again only when its
+    shape changes. The projection is applied as a painter transform.
+    """
+    def __init__(self, dpi):
+        self._pen = cosmetic_pen(GREEN, points_to_pixels(1., dpi))
+        self._shape = None
+        self.path = None
+        self.projection = None
+
+
+    def update(self, telemetry):
+        shape = (telemetry.focus_x, telemetry.semi_major_axis, telemetry.semi_minor_axis)
+        if shape != self._shape:
+            self._shape = shape
+            self.path = QPainterPath()
+            self.path.addEllipse(QPointF(-shape[0], 0), shape[1], shape[2])
+        self.projection = projection_transform(telemetry)
+
+
+    def paint(self, painter, transform):
+        if self.path is None:
+            return
+        painter.setTransform(self.projection * transform)
+        painter.setPen(self._pen)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(self.path)
+        painter.resetTransform()
+
+
+    def remove(self):
+        self._shape = None
+        self.path = None
+
+
+
+class PainterTrajectoryHyperbole(PainterTrajectoryEllipse):
+    def __init__(self, dpi):
+        PainterTrajectoryEllipse.__init__(self, dpi)
+        self._pen = cosmetic_pen(GREEN, points_to_pixels(0.8, dpi))
+
+
+    def update(self, telemetry):
+        # The samples only depend on these, and the SOI of the body
+        shape = (telemetry.semi_major_axis, telemetry.eccentricity, telemetry.ref_body_id)
+        if shape != self._shape:
+            self._shape = shape
+            self.path = QPainterPath()
+            self.path.addPolygon(QPolygonF([QPointF(x, y) for x, y in telemetry.perifocal_points.T]))
+        self.projection = projection_transform(telemetry)
+
+
+
+class PainterOrbitalPoints(object):
+    """
+    Apsides, nodes and vessel, in the orbit plane. Markers keep their size in pixels,
+    only their position is transformed.
+    """
+    def __init__(self, dpi, apoapsis=True):
+        self._apoapsis = apoapsis
+        self._marker_radius = points_to_pixels(6., dpi) / 2
+        self._marker_pen = cosmetic_pen(GREEN, points_to_pixels(1., dpi))
+        self._line_pen = cosmetic_pen(GREEN, points_to_pixels(1.5, dpi))
+        self._dash_pen = cosmetic_pen(GREEN, points_to_pixels(1.5, dpi), Qt.DashLine)
+        self.points = None
+        self.projection = None
+
+
+    def update(self, telemetry):
+        x = [telemetry.periapsis_x, telemetry.ascending_node_x, telemetry.descending_node_x, 0, telemetry.vessel_x]
+        y = [telemetry.periapsis_y, telemetry.ascending_node_y, telemetry.descending_node_y, 0, telemetry.vessel_y]
+        if self._apoapsis:
+            x.append(telemetry.apoapsis_x)
+            y.append(telemetry.apoapsis_y)
+        self.points = (x, y)
+        self.projection = projection_transform(telemetry)
+
+
+    def paint(self, painter, transform):
+        if self.points is None:
+            return
+        transform = self.projection * transform
+        pixels = [transform.map(QPointF(x, y)) for x, y in zip(*self.points)]
+        periapsis, ascending_node, descending_node, center, vessel = pixels[:5]
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(self._dash_pen)
+        painter.drawLine(ascending_node, descending_node)
+        painter.setPen(self._line_pen)
+        painter.drawLine(center, vessel)
+
+        r = self._marker_radius
+        painter.setPen(self._marker_pen)
+        painter.setBrush(GREEN)
+        painter.drawRect(QRectF(ascending_node.x() - r, ascending_node.y() - r, 2 * r, 2 * r))
+        if self._apoapsis:
+            painter.drawEllipse(pixels[5], r, r)
+        painter.setBrush(BLACK)
+        painter.drawRect(QRectF(descending_node.x() - r, descending_node.y() - r, 2 * r, 2 * r))
+        painter.drawEllipse(periapsis, r, r)
+
+
+    def remove(self):
+        self.points = None
+
+
+
+class PainterOrbitPlot(OrbitPlot):
+    def paint(self, painter, transform):
+        self.trajectory.paint(painter, transform)
+        self.points.paint(painter, transform)
+
+
+
+class PainterOrbitEllipse(PainterOrbitPlot):
+    def __init__(self, dpi):
+        OrbitPlot.__init__(self, compute_class=EllipseData)
+        self.trajectory = PainterTrajectoryEllipse(dpi)
+        self.points = PainterOrbitalPoints(dpi)
+
+
+
+class PainterOrbitHyperbole(PainterOrbitPlot):
+    def __init__(self, dpi):
+        OrbitPlot.__init__(self, compute_class=HyperboleData)
+        self.trajectory = PainterTrajectoryHyperbole(dpi)
+        self.points = PainterOrbitalPoints(dpi, apoapsis=False)
@@ -1,4 +1,5 @@
 
+from panel.instrumentation import instrumentation
 from panel.telemetry.telemetry import Telemetry
 
 
@@ -7,15 +8,20 @@ class OrbitPlot(object):
     def __init__(self, compute_class=Telemetry, default_class=Telemetry):
         self._compute_class = compute_class
         self._default_class = default_class
+        # (xmin, xmax, ymin, ymax) of the last displayed orbit
+        self.bounds = None
 
 
     def update_orbit(self, telemetry):
-        telemetry.__class__ = self._compute_class
-        self.trajectory.update(telemetry)
-        self.points.update(telemetry)
-        telemetry.__class__ = self._default_class
+        with instrumentation.stage('orbit'):
+            telemetry.__class__ = self._compute_class
+            self.trajectory.update(telemetry)
+            self.points.update(telemetry)
+            self.bounds = telemetry.orbit_bounds
+            telemetry.__class__ = self._default_class
 
 
     def remove(self):
         self.trajectory.remove()
         self.points.remove()
+        self.bounds = None
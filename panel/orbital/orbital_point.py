@@ -1,134 +1,196 @@
-from matplotlib.lines import Line2D
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.markers import MarkerStyle
+from matplotlib.transforms import IdentityTransform
 
-
-class OrbitPointPlot(object):
-    def __init__(self, axes, *args, **kwargs):
-        self._axes = axes
-        self._args = args
-        self._kwargs = kwargs
-        self._plot = None
+# Styles of the former Line2D points, in points
+MARKER_SIZE = 6
+MARKER_EDGE_WIDTH = 1.
+LINE_WIDTH = 1.5
 
 
-    def _create_plot(self, telemetry):
-        x, y = telemetry.projection(self._get_x(telemetry), self._get_y(telemetry))
-        self._plot = Line2D(x, y, *self._args, **self._kwargs)
-        self._axes.add_line(self._plot)
+def marker_path(marker):
+    style = MarkerStyle(marker)
+    return style.get_path().transformed(style.get_transform())
 
 
-    def update_plot(self, telemetry):
-        if not self._plot:
-            self._create_plot(telemetry)
-        else:
-            x, y = telemetry.projection(self._get_x(telemetry), self._get_y(telemetry))
-            self._plot.set_xdata(x)
-            self._plot.set_ydata(y)
 
+class OrbitalPoint(object):
+    """
+    Point displayed as a marker, empty markers are filled with the background color
+    """
+    marker = 'o'
+    filled = True
 
     def _get_x(self, telemetry):
         """
-        Return list with x from corresponding data in telemetry
+        Return x from corresponding data in telemetry
         """
         pass
 
 
     def _get_y(self, telemetry):
         """
-        Return list with y from corresponding data in telemetry
+        Return y from corresponding data in telemetry
         """
         pass
 
 
-    def remove(self):
-        if self._plot:
-            self._plot.remove()
-            self._plot = None
 
+class OrbitalLine(object):
+    linestyle = '-'
+
+    def _get_x(self, telemetry):
+        """
+        Return [x start, x end] from corresponding data in telemetry
+        """
+        pass
+
+
+    def _get_y(self, telemetry):
+        """
+        Return [y start, y end] from corresponding data in telemetry
+        """
+        pass
 
 
-class AscendingPlot(OrbitPointPlot):
-    def __init__(self, axes):
-        # Plot ascending node position like a filled square
-        OrbitPointPlot.__init__(self, axes, marker='s', markersize='6', color='green')
 
+class AscendingPoint(OrbitalPoint):
+    # Plot ascending node position like a filled square
+    marker = 's'
 
     def _get_x(self, telemetry):
-        return [telemetry.ascending_node_x]
+        return telemetry.ascending_node_x
 
 
     def _get_y(self, telemetry):
-         return [telemetry.ascending_node_y]
+        return telemetry.ascending_node_y
 
 
 
-class DescendingPlot(OrbitPointPlot):
-    def __init__(self, axes):
-        # Plot descending node position like a empy square
-        OrbitPointPlot.__init__(self, axes, marker='s', markerfacecolor='black', markersize='6', color='green')
-
+class DescendingPoint(OrbitalPoint):
+    # Plot descending node position like a empty square
+    marker = 's'
+    filled = False
 
     def _get_x(self, telemetry):
-        return [telemetry.descending_node_x]
+        return telemetry.descending_node_x
 
 
     def _get_y(self, telemetry):
-         return [telemetry.descending_node_y]
+        return telemetry.descending_node_y
+
+
 
+class PeriapsisPoint(OrbitalPoint):
+    # Plot periapsis position like a empty circle
+    filled = False
 
+    def _get_x(self, telemetry):
+        return telemetry.periapsis_x
+
+
+    def _get_y(self, telemetry):
+        return telemetry.periapsis_y
 
-class AscendingDescendingLine(OrbitPointPlot):
-    def __init__(self, axes):
-        # Plot dashed line between ascending and descending node
-        OrbitPointPlot.__init__(self, axes, linestyle='--', marker='None', color='green')
 
 
+class ApoapsisPoint(OrbitalPoint):
+    # Plot apoapsis position like a filled circle
     def _get_x(self, telemetry):
-        return [telemetry.ascending_node_x, telemetry.descending_node_x]
+        return telemetry.apoapsis_x
 
 
     def _get_y(self, telemetry):
-         return [telemetry.ascending_node_y, telemetry.descending_node_y]
+        return telemetry.apoapsis_y
+
 
 
+class AscendingDescendingLine(OrbitalLine):
+    # Plot dashed line between ascending and descending node
+    linestyle = '--'
+
+    def _get_x(self, telemetry):
+        return [telemetry.ascending_node_x, telemetry.descending_node_x]
+
+
+    def _get_y(self, telemetry):
+        return [telemetry.ascending_node_y, telemetry.descending_node_y]
 
-class PeriapsisPlot(OrbitPointPlot):
-    def __init__(self, axes):
-        # Plot periapsis position like a empty circle
-        OrbitPointPlot.__init__(self, axes, marker='o', markerfacecolor='black', markersize='6', color='green')
 
 
+class VesselLine(OrbitalLine):
+    # Plot vessel position like a line between the center of mass of the ref body and the vessel position
     def _get_x(self, telemetry):
-        return [telemetry.periapsis_x]
+        return [0, telemetry.vessel_x]
 
 
     def _get_y(self, telemetry):
-         return [telemetry.periapsis_y]
+        return [0, telemetry.vessel_y]
 
 
 
-class ApoapsisPlot(OrbitPointPlot):
-    def __init__(self, axes):
-        # Plot apoapsis position like a filled circle
-        OrbitPointPlot.__init__(self, axes, marker='o', markersize='6', color='green')
+class OrbitalMarkers(object):
+    """
+    Markers of several orbital points drawn by a single collection
+    """
+    def __init__(self, axes, points, color='green', background='black'):
+        self._axes = axes
+        self._paths = [marker_path(point.marker) for point in points]
+        self._facecolors = [color if point.filled else background for point in points]
+        self._color = color
+        self._collection = None
 
 
-    def _get_x(self, telemetry):
-        return [telemetry.apoapsis_x]
+    def _create_collection(self, offsets):
+        self._collection = PathCollection(self._paths, sizes=[MARKER_SIZE ** 2], offsets=offsets,
+                                          offset_transform=self._axes.transData, facecolors=self._facecolors,
+                                          edgecolors=self._color, linewidths=MARKER_EDGE_WIDTH, zorder=2)
+        # Marker paths are in points, only their offsets are in data coordinates
+        self._collection.set_transform(IdentityTransform())
+        self._axes.add_collection(self._collection, autolim=False)
 
 
-    def _get_y(self, telemetry):
-         return [telemetry.apoapsis_y]
+    def set_data(self, offsets):
+        """
+        Display already projected points, shape (n, 2)
+        """
+        if not self._collection:
+            self._create_collection(offsets)
+        else:
+            self._collection.set_offsets(offsets)
 
 
+    def remove(self):
+        if self._collection:
+            self._collection.remove()
+            self._collection = None
 
-class VesselPlot(OrbitPointPlot):
-    def __init__(self, telemetry):
-        # Plot vessel position like a line between the center of mass of the ref body and the vessel position
-        OrbitPointPlot.__init__(self, telemetry, marker='None', color='green')
 
 
-    def _get_x(self, telemetry):
-        return [0, telemetry.vessel_x]
+class OrbitalLines(object):
+    """
+    Segments of several orbital lines drawn by a single collection
+    """
+    def __init__(self, axes, lines, color='green'):
+        self._axes = axes
+        self._linestyles = [line.linestyle for line in lines]
+        self._color = color
+        self._collection = None
 
 
-    def _get_y(self, telemetry):
-         return [0, telemetry.vessel_y]
\ No newline at end of file
+    def set_data(self, segments):
+        """
+        Display already projected segments, shape (n, 2, 2)
+        """
+        if not self._collection:
+            self._collection = LineCollection(segments, linestyles=self._linestyles, colors=self._color,
+                                              linewidths=LINE_WIDTH, zorder=2)
+            self._axes.add_collection(self._collection, autolim=False)
+        else:
+            self._collection.set_segments(segments)
+
+
+    def remove(self):
+        if self._collection:
+            self._collection.remove()
+            self._collection = None
@@ -1,24 +1,32 @@
-from panel.orbital.orbital_point import PeriapsisPlot, ApoapsisPlot, AscendingPlot, DescendingPlot, AscendingDescendingLine, VesselPlot
+import numpy as np
+
+from panel.orbital.orbital_point import AscendingDescendingLine, VesselLine, OrbitalLines, OrbitalMarkers
 
 
 class OrbitalPointsPlot(object):
+    # Points and lines displayed for this kind of orbit
+    points = ()
+    lines = (AscendingDescendingLine(), VesselLine())
+
     def __init__(self, axes):
-        self.periapsis_plot = PeriapsisPlot(axes)
-        self.apoapsis_plot = ApoapsisPlot(axes)
-        self.ascending_plot = AscendingPlot(axes)
-        self.descending_plot = DescendingPlot(axes)
-        self.ascending_descending = AscendingDescendingLine(axes)
-        self.vessel_plot = VesselPlot(axes)
+        self.markers_plot = OrbitalMarkers(axes, self.points)
+        self.lines_plot = OrbitalLines(axes, self.lines)
 
 
     def update(self, telemetry):
-        pass
+        # Every marker then every line end in a single array, projected at once
+        x = [point._get_x(telemetry) for point in self.points]
+        y = [point._get_y(telemetry) for point in self.points]
+        for line in self.lines:
+            x.extend(line._get_x(telemetry))
+            y.extend(line._get_y(telemetry))
+        points = telemetry.project_points(np.array([x, y], dtype=float)).T
+
+        count = len(self.points)
+        self.markers_plot.set_data(points[:count])
+        self.lines_plot.set_data(points[count:].reshape(-1, 2, 2))
 
 
     def remove(self):
-        self.periapsis_plot.remove()
-        self.apoapsis_plot.remove()
-        self.ascending_plot.remove()
-        self.descending_plot.remove()
-        self.ascending_descending.remove()
-        self.vessel_plot.remove()
\ No newline at end of file
+        self.markers_plot.remove()
+        self.lines_plot.remove()
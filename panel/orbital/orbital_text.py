@@ -1,3 +1,7 @@
+import time
+from matplotlib.transforms import ScaledTranslation
+
+from panel.mfd.cached_text import CachedText, line_offsets
 from panel.telemetry.telemetry import PROJECTION
 
 class OrbitPointText(object):
@@ -21,6 +25,17 @@ class OrbitPointText(object):
             self._text.set_text(text)
 
 
+    def get_text(self):
+        if self._text:
+            return self._text.get_text()
+        return None
+
+
+    @property
+    def artists(self):
+        return [self._text] if self._text else []
+
+
     def remove(self):
         if self._text:
             self._text.remove()
@@ -28,8 +43,71 @@ class OrbitPointText(object):
 
 
 
-class ShipOrbitalText(OrbitPointText):
+class TextLines(object):
+    """
+    Multi-line text drawn by one CachedText per line: a frame only lays out and
+    rasterizes the lines which changed. Lines hang from (x, y) like a top aligned text.
+    """
+    def __init__(self, axes, x, y, *args, **kwargs):
+        self._axes = axes
+        self._args = args
+        self._kwargs = kwargs
+        self._x = x
+        self._y = y
+        self._texts = []
+        self._line_offsets = None
+
+
+    def _create_line(self, index, line):
+        text = CachedText(self._x, self._y, line, *self._args, **dict(self._kwargs, verticalalignment='top'))
+        if self._line_offsets is None:
+            self._line_offsets = line_offsets(text)
+        height, offset = self._line_offsets
+        text.set_transform(text.get_transform() + ScaledTranslation(0, -(offset + index * height) / 72.,
+                                                                    self._axes.figure.dpi_scale_trans))
+        self._axes.add_artist(text)
+        # Not clipped, as the texts of axes.text
+        text.set_clip_path(None)
+        return text
+
+
+    def update_lines(self, lines):
+        texts = self._texts
+        for index, line in enumerate(lines):
+            if index < len(texts):
+                texts[index].set_text(line)
+            else:
+                texts.append(self._create_line(index, line))
+        for text in texts[len(lines):]:
+            text.remove()
+        del texts[len(lines):]
+
+
+    def get_text(self):
+        if self._texts:
+            return '\n'.join(text.get_text() for text in self._texts)
+        return None
+
+
+    @property
+    def artists(self):
+        return self._texts
+
+
+    def remove(self):
+        for text in self._texts:
+            text.remove()
+        self._texts = []
+
+
+
+class ShipOrbitalText(TextLines):
     def update_text(self, telemetry):
+        self.update_lines(self.lines(telemetry))
+
+
+    @staticmethod
+    def lines(telemetry):
         _text = []
         _text.append('----SELF----')
         _text.append('Pe  %s' % telemetry.str_km('periapsis_altitude'))
@@ -46,8 +124,39 @@ class ShipOrbitalText(OrbitPointText):
         _text.append('AgP %.4f°' % telemetry.argument_of_periapsis_deg)
         _text.append('Tra %.4f°' % telemetry.true_anomaly)
         _text.append('Mna %.4f°' % telemetry.mean_anomaly)
-        _text = '\n'.join(_text)
-        OrbitPointText.update_text(self, _text)
+        return _text
+
+
+
+class StatsText(OrbitPointText):
+    """
+    Pipeline stages timing, refreshed every `interval` s so the overlay
+    itself does not force a redraw every frame.
+    """
+    STAGES = ('worker', 'update', 'orbital', 'draw', 'paint', 'frame')
+
+    def __init__(self, axes, x, y, *args, **kwargs):
+        self.interval = kwargs.pop('interval', 0.5)
+        OrbitPointText.__init__(self, axes, x, y, *args, **kwargs)
+        self._last_update = None
+
+
+    def update_text(self, instrumentation):
+        now = time.perf_counter()
+        if self._text and now - self._last_update < self.interval:
+            return
+        self._last_update = now
+        _text = []
+        _text.append('STAGE      P50    P99 ms')
+        for stage in self.STAGES:
+            _text.append('%-7s %6.2f %6.2f' % (stage, instrumentation.percentile(stage, 50),
+                                                 instrumentation.percentile(stage, 99)))
+        _text.append('RPC/frame  %.1f' % instrumentation.mean('rpc/frame'))
+        if 'fleet rpc/frame' in instrumentation.histograms:
+            _text.append('Fleet RPC  %.1f' % instrumentation.mean('fleet rpc/frame'))
+        _text.append('Age    %6.1f ms' % instrumentation.percentile('frame age', 50))
+        _text.append('FPS    %6.1f' % instrumentation.rate('draw'))
+        OrbitPointText.update_text(self, '\n'.join(_text))
 
 
 
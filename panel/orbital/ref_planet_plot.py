@@ -1,6 +1,6 @@
 from matplotlib.patches import Ellipse
 
-from panel.planet_data import PLANET_DATA
+from panel.planet_data import BODIES
 
 
 
@@ -21,12 +21,12 @@ class RefPlanetPlot(object):
         if self._ref_planet_name == telemetry.ref_body_name:
             return
         self._ref_planet_name = telemetry.ref_body_name
-        self._diameter = PLANET_DATA[self._ref_planet_name]['radius'] *1000 * 2
+        self._diameter = BODIES.body(self._ref_planet_name).radius * 2
         if not self._ref_planet_plot:
             self._create_ref_planet()
         else:
-            self._ref_planet_plot.width = diameter
-            self._ref_planet_plot.height = diameter
+            self._ref_planet_plot.width = self._diameter
+            self._ref_planet_plot.height = self._diameter
 
 
     def remove(self):
@@ -7,15 +7,23 @@ from panel.orbital.trajectory_plot import TrajectoryPlot
 
 class TrajectoryEllipse(TrajectoryPlot):
 
+    def _ellipse_geometry(self, telemetry):
+        # Center, width and height vectors projected together
+        points = telemetry.project_points(np.array([
+            [-telemetry.focus_x, telemetry.width, 0],
+            [-telemetry.focus_y, 0, telemetry.height]
+        ], dtype=float))
+        width = np.hypot(points[0, 1], points[1, 1])
+        height = np.hypot(points[0, 2], points[1, 2])
+        angle = telemetry.longitude_of_ascending_node_deg + telemetry.argument_of_periapsis_deg
+        return (points[0, 0], points[1, 0]), width, height, angle
+
+
     def _create_trajectory(self, telemetry):
-        x, y = telemetry.projection(-telemetry.focus_x, -telemetry.focus_y)
-        x_w, y_w = telemetry.projection(telemetry.width, 0)
-        width = np.sqrt(x_w**2 + y_w**2)
-        x_h, y_h = telemetry.projection(0, telemetry.height)
-        height = np.sqrt(x_h**2 + y_h**2)
-        self._orbit_plot = Ellipse((x, y),
+        center, width, height, angle = self._ellipse_geometry(telemetry)
+        self._orbit_plot = Ellipse(center,
                                    width=width, height=height,
-                                   angle=telemetry.longitude_of_ascending_node_deg + telemetry.argument_of_periapsis_deg,
+                                   angle=angle,
                                    fill=False, color='green')
         self._axes.add_patch(self._orbit_plot)
 
@@ -24,15 +32,11 @@ class TrajectoryEllipse(TrajectoryPlot):
         if not self._orbit_plot:
             self._create_trajectory(telemetry)
         else:
-            x, y = telemetry.projection(-telemetry.focus_x, -telemetry.focus_y)
-            x_w, y_w = telemetry.projection(telemetry.width, 0)
-            width = np.sqrt(x_w**2 + y_w**2)
-            x_h, y_h = telemetry.projection(0, telemetry.height)
-            height = np.sqrt(x_h**2 + y_h**2)
-            self._orbit_plot.center = (x, y)
+            center, width, height, angle = self._ellipse_geometry(telemetry)
+            self._orbit_plot.center = center
             self._orbit_plot.width = width
             self._orbit_plot.height = height
-            self._orbit_plot.angle = telemetry.longitude_of_ascending_node_deg + telemetry.argument_of_periapsis_deg
+            self._orbit_plot.angle = angle
 
 
     def remove(self):
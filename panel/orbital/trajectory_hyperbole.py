@@ -1,16 +1,25 @@
+from matplotlib.lines import Line2D
+
 from panel.orbital.trajectory_plot import TrajectoryPlot
 
 
 
 class TrajectoryHyperbole(TrajectoryPlot):
 
+    def _create_trajectory(self, telemetry):
+        self._orbit_plot = Line2D(telemetry.hyperbole_x, telemetry.hyperbole_y,
+                                  color='green', linewidth=0.8)
+        self._axes.add_line(self._orbit_plot)
+
+
     def update(self, telemetry):
-        self.remove()
-        self._orbit_plot = self.axes.plot(telemetry.hyperbole_x, telemetry.hyperbole_y,
-                                          color='green', linewidth=0.8)
+        if not self._orbit_plot:
+            self._create_trajectory(telemetry)
+        else:
+            self._orbit_plot.set_data(telemetry.hyperbole_x, telemetry.hyperbole_y)
 
 
     def remove(self):
         if self._orbit_plot:
-            self._orbit_plot.pop(0).remove()
+            self._orbit_plot.remove()
         self._orbit_plot = None
@@ -0,0 +1,63 @@
+from panel.planet_data import BODIES
+
+
+
+class ViewLimits(object):
+    """
+    Axes limits computed from the orbit bounds and the reference planet,
+    with an equal scale on both axes.
+    Limits are kept while the orbit stays inside them and fills at least `shrink`
+    of their size, so small orbit changes do not rescale the view.
+    """
+    def __init__(self, axes, margin=0.1, shrink=0.6):
+        self._axes = axes
+        self._margin = margin
+        self._shrink = shrink
+        self._limits = None
+        self._axes_ratio = None
+        self._axes.set_autoscale_on(False)
+
+
+    def update(self, ref_body_id, orbit_bounds):
+        """
+        Return True when the matplotlib limits were changed
+        """
+        planet_radius = BODIES.bodies[ref_body_id].radius
+        xmin, xmax, ymin, ymax = -planet_radius, planet_radius, -planet_radius, planet_radius
+        if orbit_bounds:
+            xmin = min(xmin, orbit_bounds[0])
+            xmax = max(xmax, orbit_bounds[1])
+            ymin = min(ymin, orbit_bounds[2])
+            ymax = max(ymax, orbit_bounds[3])
+
+        bbox = self._axes.bbox
+        axes_ratio = bbox.width / bbox.height
+        center_x = (xmin + xmax) / 2.0
+        center_y = (ymin + ymax) / 2.0
+        # Same data per pixel scale on both axes
+        half_x = max((xmax - xmin) / 2.0, (ymax - ymin) / 2.0 * axes_ratio)
+        half_y = half_x / axes_ratio
+
+        if axes_ratio == self._axes_ratio and self._fit(center_x, center_y, half_x, half_y):
+            return False
+
+        half_x *= 1 + self._margin
+        half_y *= 1 + self._margin
+        self._limits = (center_x - half_x, center_x + half_x, center_y - half_y, center_y + half_y)
+        self._axes_ratio = axes_ratio
+        self._axes.set_xlim(self._limits[0], self._limits[1])
+        self._axes.set_ylim(self._limits[2], self._limits[3])
+        return True
+
+
+    def _fit(self, center_x, center_y, half_x, half_y):
+        if not self._limits:
+            return False
+        xmin, xmax, ymin, ymax = self._limits
+        inside = (center_x - half_x >= xmin and center_x + half_x <= xmax and
+                  center_y - half_y >= ymin and center_y + half_y <= ymax)
+        return inside and 2 * half_x >= self._shrink * (xmax - xmin)
+
+
+    def reset(self):
+        self._limits = None
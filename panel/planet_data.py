@@ -1,3 +1,5 @@
+from collections import namedtuple
+import numpy as np
 
 PLANET_DATA = {
     # all values in km and corresponding
@@ -167,4 +169,38 @@ PLANET_DATA = {
         'soi': 119082.94,
         'color': "grey"
     }
-}
\ No newline at end of file
+}
+
+
+
+# Body constants in SI units
+Body = namedtuple('Body', ('name', 'parent', 'mu', 'radius', 'soi'))
+
+
+
+class BodyTable(object):
+    """
+    PLANET_DATA compiled once, in SI units, indexed by body id.
+    Columns are NumPy arrays for vectorized lookups, bodies holds the same values
+    as Python floats, faster to index and compute with one body at a time.
+    The root body has no SOI (inf) and no parent (-1).
+    """
+    def __init__(self, planet_data):
+        data = list(planet_data.values())
+        self.names = [body['name'] for body in data]
+        # Lowercase names, as read from krpc
+        self.ids = dict((name.lower(), index) for index, name in enumerate(self.names))
+        self.parent = np.array([self.ids[body['parent'].lower()] if 'parent' in body else -1 for body in data])
+        self.mu = np.array([body['mu'] * 1e9 for body in data])
+        self.radius = np.array([body['radius'] * 1e3 for body in data])
+        self.soi = np.array([body['soi'] * 1e3 if 'soi' in body else np.inf for body in data])
+        self.bodies = [Body(*values) for values in zip(self.names, self.parent.tolist(), self.mu.tolist(),
+                                                        self.radius.tolist(), self.soi.tolist())]
+
+
+    def body(self, name):
+        return self.bodies[self.ids[name]]
+
+
+
+BODIES = BodyTable(PLANET_DATA)
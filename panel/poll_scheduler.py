@@ -0,0 +1,89 @@
+import math
+from enum import Enum
+
+
+
+class TIER(Enum):
+    # Values changing along the orbit or with a burn: vessel position, speed and orbit shape
+    FAST = 'fast'
+    # The orbit plane and the reference body
+    SLOW = 'slow'
+
+
+
+class PollScheduler(object):
+    """
+    Poll intervals of the fast and slow telemetry tiers, in s.
+    The fast interval moves the vessel by about FAST_STEP along its orbit at the
+    current time warp, within [min_interval, max_interval]. The slow tier is read
+    SLOW_RATIO times less often, at least every slow_interval.
+    No tier is polled more often than LATENCY_FACTOR times its read duration,
+    and a poll waits while the renderer has not taken the previous snapshot.
+    """
+    # Vessel motion along its orbit between two fast polls, in rad,
+    # about half a pixel on a 300 pixels wide orbit
+    FAST_STEP = math.radians(0.1)
+    SLOW_RATIO = 10
+    # Leave the server idle at least half the time
+    LATENCY_FACTOR = 2.
+    # Weight of the last read in the read duration average
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, min_interval=0.025, max_interval=0.5, slow_interval=2.0):
+        self.min_interval = min_interval
+        # A min_interval over max_interval is polled at, not shortened
+        self.max_interval = max(max_interval, min_interval)
+        self.slow_interval = slow_interval
+        self.fast_interval = min_interval
+        self.latency = {TIER.FAST: None, TIER.SLOW: None}
+        self._next_slow = 0.
+
+
+    def update_orbit(self, mean_motion, warp_rate):
+        """
+        mean_motion: in rad per s of ut
+        """
+        if mean_motion > 0:
+            interval = self.FAST_STEP / (mean_motion * max(warp_rate, 1.))
+        else:
+            interval = self.min_interval
+        self.fast_interval = min(max(interval, self.min_interval), self.max_interval)
+
+
+    def _interval(self, tier):
+        if tier == TIER.FAST:
+            interval = self.fast_interval
+        else:
+            interval = min(self.fast_interval * self.SLOW_RATIO, self.slow_interval)
+        latency = self.latency[tier]
+        if latency is not None:
+            interval = max(interval, latency * self.LATENCY_FACTOR)
+        return interval
+
+
+    def tier(self, now):
+        return TIER.SLOW if now >= self._next_slow else TIER.FAST
+
+
+    def done(self, tier, start, end):
+        """
+        Record a read of tier from start to end, monotonic times
+        """
+        latency = self.latency[tier]
+        if latency is None:
+            self.latency[tier] = end - start
+        else:
+            self.latency[tier] = latency + (end - start - latency) * self.LATENCY_SMOOTHING
+        if tier == TIER.SLOW:
+            self._next_slow = start + self._interval(TIER.SLOW)
+
+
+    def delay(self, start, now, backlog=False):
+        """
+        Delay from now to the next poll, the last one started at start.
+        backlog: the renderer has not taken the last snapshot yet
+        """
+        interval = self._interval(TIER.FAST)
+        if backlog:
+            return interval
+        return max(0., start + interval - now)
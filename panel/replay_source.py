@@ -0,0 +1,68 @@
+import time
+from PyQt5.QtCore import QTimer, pyqtSignal, pyqtSlot, Qt
+
+from panel.instrumentation import instrumentation
+from panel.telemetry.recording import TelemetryRecording
+from panel.telemetry_source import TelemetrySource
+
+
+
+class ReplaySource(TelemetrySource):
+    """
+    Replay a telemetry recording.
+    speed: 1 for the recorded pace, 2 twice as fast..., 0 as fast as possible.
+    """
+    replay_finished = pyqtSignal()
+
+    def __init__(self, path, speed=1.0, **kwargs):
+        super(ReplaySource, self).__init__(**kwargs)
+        self.path = path
+        self.speed = speed
+        self.recording = None
+        self._timer = None
+        self._index = 0
+        self._start_time = None
+
+
+    @pyqtSlot()
+    def start(self):
+        TelemetrySource.start(self)
+        self.recording = TelemetryRecording(self.path)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.replay_next)
+        self._index = 0
+        self._start_time = time.monotonic()
+        self.replay_next()
+
+
+    @pyqtSlot()
+    def stop(self):
+        if self._timer:
+            self._timer.stop()
+        TelemetrySource.stop(self)
+
+
+    @pyqtSlot()
+    def replay_next(self):
+        recording = self.recording
+        if self._index >= len(recording):
+            self.replay_finished.emit()
+            return
+        self.begin_frame()
+        with instrumentation.stage('worker'):
+            snapshot = recording.snapshot(self._index)
+        self.publish(snapshot)
+        self._index += 1
+        if self._index >= len(recording):
+            self._timer.start(0)
+            return
+
+        delay = 0
+        if self.speed > 0:
+            # Scheduled from the replay start so timer jitter does not accumulate
+            wall_time = recording['wall_time']
+            target = (wall_time[self._index] - wall_time[0]) / self.speed
+            delay = max(0, int((target - (time.monotonic() - self._start_time)) * 1000))
+        self._timer.start(delay)
@@ -0,0 +1,422 @@
+#!/usr/bin/python3
+"""
+Stand-in kRPC server, answering the procedures and streams the panel uses
+from a KeplerSimulation. For load tests and benchmarks without KSP.
+
+    python -m panel.server.krpc_server --vessels 10 --latency 5 --jitter 2
+"""
+import argparse
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+from google.protobuf.internal.decoder import _DecodeVarint
+import krpc.schema.KRPC_pb2 as KRPC
+from krpc.decoder import Decoder
+from krpc.encoder import Encoder
+from krpc.types import Types
+
+from panel.server.simulation import KeplerSimulation, SimReferenceFrame
+from panel.telemetry.telemetry import ORBIT_FIELDS
+
+
+
+_TYPES = Types()
+DOUBLE = _TYPES.double_type
+FLOAT = _TYPES.float_type
+UINT64 = _TYPES.uint64_type
+SINT32 = _TYPES.sint32_type
+STRING = _TYPES.string_type
+BOOL = _TYPES.bool_type
+BYTES = _TYPES.bytes_type
+PROCEDURE_CALL = _TYPES.procedure_call_type
+VECTOR3 = _TYPES.tuple_type(DOUBLE, DOUBLE, DOUBLE)
+# Remote objects travel as uint64 ids, 0 is None
+OBJECT = 'object'
+OBJECT_LIST = 'object list'
+# Encoded message returned as is
+MESSAGE = 'message'
+
+# krpc GameScene.flight
+FLIGHT_SCENE = 1
+
+Procedure = namedtuple('Procedure', ('func', 'param_types', 'return_type'))
+
+
+
+def _camel_case(name):
+    return ''.join(word.capitalize() for word in name.split('_'))
+
+
+
+class ProcedureError(Exception):
+    pass
+
+
+
+class _Client(object):
+    def __init__(self, rpc_socket):
+        self.identifier = os.urandom(16)
+        self.rpc_socket = rpc_socket
+        self.stream_socket = None
+        # Encoded ProcedureCall -> stream id, every client has its own streams
+        self.stream_ids = {}
+        self.streams = {}
+        self.started = set()
+        self.last_values = {}
+        self.lock = threading.Lock()
+
+
+
+class KrpcServer(object):
+    """
+    Speak the kRPC protocol on an rpc and a stream port, port 0 pick a free one.
+    latency and jitter, in s, delay every RPC response by latency +- jitter.
+    Started streams are pushed stream_rate times per second, only when their value changed.
+    """
+    def __init__(self, simulation, address='127.0.0.1', rpc_port=50000, stream_port=50001,
+                 latency=0., jitter=0., stream_rate=60.):
+        self.simulation = simulation
+        self.address = address
+        self.rpc_port = rpc_port
+        self.stream_port = stream_port
+        self.latency = latency
+        self.jitter = jitter
+        self.stream_rate = stream_rate
+
+        self.rpc_count = 0
+        self.request_count = 0
+        self.stream_update_count = 0
+
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._next_stream_id = 1
+        self._objects = {}
+        self._object_ids = {}
+        self._objects_lock = threading.Lock()
+        self._running = threading.Event()
+        self._threads = []
+        self._sockets = []
+        self._procedures = self._build_procedures()
+
+
+    def _build_procedures(self):
+        sim = self.simulation
+        procedures = {
+            ('KRPC', 'GetServices'): Procedure(self._get_services, (), MESSAGE),
+            ('KRPC', 'GetClientID'): Procedure(None, (), BYTES),
+            ('KRPC', 'get_CurrentGameScene'): Procedure(lambda: FLIGHT_SCENE, (), SINT32),
+            ('KRPC', 'AddStream'): Procedure(None, (PROCEDURE_CALL, BOOL), MESSAGE),
+            ('KRPC', 'StartStream'): Procedure(None, (UINT64,), None),
+            ('KRPC', 'RemoveStream'): Procedure(None, (UINT64,), None),
+            ('KRPC', 'SetStreamRate'): Procedure(lambda stream_id, rate: None, (UINT64, FLOAT), None),
+            ('SpaceCenter', 'get_UT'): Procedure(lambda: sim.ut, (), DOUBLE),
+            ('SpaceCenter', 'get_WarpRate'): Procedure(lambda: sim.warp, (), FLOAT),
+            ('SpaceCenter', 'get_ActiveVessel'): Procedure(lambda: sim.active_vessel, (), OBJECT),
+            ('SpaceCenter', 'get_Vessels'): Procedure(lambda: sim.vessels, (), OBJECT_LIST),
+            ('SpaceCenter', 'Vessel_get_Name'): Procedure(lambda vessel: vessel.name, (OBJECT,), STRING),
+            ('SpaceCenter', 'Vessel_get_Orbit'): Procedure(lambda vessel: vessel.orbit, (OBJECT,), OBJECT),
+            ('SpaceCenter', 'Vessel_get_Thrust'): Procedure(lambda vessel: vessel.thrust, (OBJECT,), FLOAT),
+            ('SpaceCenter', 'Vessel_Position'): Procedure(
+                lambda vessel, frame: vessel.position(frame), (OBJECT, OBJECT), VECTOR3),
+            ('SpaceCenter', 'Vessel_Velocity'): Procedure(
+                lambda vessel, frame: vessel.velocity(frame), (OBJECT, OBJECT), VECTOR3),
+            ('SpaceCenter', 'Orbit_get_Body'): Procedure(lambda orbit: orbit.body, (OBJECT,), OBJECT),
+            ('SpaceCenter', 'Orbit_get_TimeToSOIChange'): Procedure(
+                lambda orbit: orbit.time_to_soi_change, (OBJECT,), DOUBLE),
+            ('SpaceCenter', 'Orbit_UTAtTrueAnomaly'): Procedure(
+                lambda orbit, true_anomaly: orbit.ut_at_true_anomaly(true_anomaly), (OBJECT, DOUBLE), DOUBLE),
+            ('SpaceCenter', 'Orbit_static_ReferencePlaneDirection'): Procedure(
+                lambda frame: SimReferenceFrame.REFERENCE_PLANE_DIRECTION, (OBJECT,), VECTOR3),
+            ('SpaceCenter', 'Orbit_static_ReferencePlaneNormal'): Procedure(
+                lambda frame: SimReferenceFrame.REFERENCE_PLANE_NORMAL, (OBJECT,), VECTOR3),
+            ('SpaceCenter', 'CelestialBody_get_Name'): Procedure(lambda body: body.name, (OBJECT,), STRING),
+            ('SpaceCenter', 'CelestialBody_get_NonRotatingReferenceFrame'): Procedure(
+                lambda body: body.non_rotating_reference_frame, (OBJECT,), OBJECT),
+        }
+        for name in ORBIT_FIELDS:
+            procedures[('SpaceCenter', 'Orbit_get_' + _camel_case(name))] = Procedure(
+                lambda orbit, name=name: getattr(orbit, name), (OBJECT,), DOUBLE)
+        return procedures
+
+
+    def start(self):
+        self._running.set()
+        rpc_socket = self._listen(self.rpc_port)
+        stream_socket = self._listen(self.stream_port)
+        self.rpc_port = rpc_socket.getsockname()[1]
+        self.stream_port = stream_socket.getsockname()[1]
+        self._start_thread(self._accept_loop, rpc_socket, self._serve_rpc)
+        self._start_thread(self._accept_loop, stream_socket, self._serve_stream)
+        self._start_thread(self._stream_loop)
+
+
+    def stop(self):
+        self._running.clear()
+        for sock in self._sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        for thread in self._threads:
+            thread.join()
+        self._sockets = []
+        self._threads = []
+
+
+    def _listen(self, port):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.address, port))
+        sock.listen()
+        self._sockets.append(sock)
+        return sock
+
+
+    def _start_thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+
+    def _accept_loop(self, listen_socket, serve):
+        while self._running.is_set():
+            try:
+                sock, _ = listen_socket.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sockets.append(sock)
+            self._start_thread(serve, sock)
+
+
+    # Protocol
+
+    @staticmethod
+    def _receive_message(sock, message_type):
+        data = b''
+        while True:
+            byte = sock.recv(1)
+            if not byte:
+                raise EOFError()
+            data += byte
+            if not byte[0] & 0x80:
+                break
+        size, _ = _DecodeVarint(data, 0)
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise EOFError()
+            data += chunk
+        message = message_type()
+        message.ParseFromString(data)
+        return message
+
+
+    @staticmethod
+    def _send_message(sock, message):
+        sock.sendall(Encoder.encode_message_with_size(message))
+
+
+    def _serve_rpc(self, sock):
+        client = None
+        try:
+            self._receive_message(sock, KRPC.ConnectionRequest)
+            client = _Client(sock)
+            with self._clients_lock:
+                self._clients[client.identifier] = client
+            self._send_message(sock, KRPC.ConnectionResponse(status=KRPC.ConnectionResponse.OK,
+                                                             client_identifier=client.identifier))
+            while self._running.is_set():
+                request = self._receive_message(sock, KRPC.Request)
+                response = KRPC.Response()
+                response.results.extend(self._call(client, call) for call in request.calls)
+                delay = self.latency + random.uniform(-self.jitter, self.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+                self.request_count += 1
+                self.rpc_count += len(request.calls)
+                self._send_message(sock, response)
+        except (EOFError, OSError):
+            pass
+        finally:
+            if client is not None:
+                with self._clients_lock:
+                    self._clients.pop(client.identifier, None)
+            sock.close()
+
+
+    def _serve_stream(self, sock):
+        try:
+            request = self._receive_message(sock, KRPC.ConnectionRequest)
+            with self._clients_lock:
+                client = self._clients.get(request.client_identifier)
+            if client is None:
+                self._send_message(sock, KRPC.ConnectionResponse(status=KRPC.ConnectionResponse.WRONG_TYPE,
+                                                                 message='Unknown client'))
+                sock.close()
+                return
+            self._send_message(sock, KRPC.ConnectionResponse(status=KRPC.ConnectionResponse.OK))
+            client.stream_socket = sock
+        except (EOFError, OSError):
+            sock.close()
+
+
+    def _stream_loop(self):
+        while self._running.is_set():
+            next_update = time.monotonic() + 1. / self.stream_rate
+            with self._clients_lock:
+                clients = list(self._clients.values())
+            for client in clients:
+                if client.stream_socket is not None:
+                    self._push_streams(client)
+            time.sleep(max(0., next_update - time.monotonic()))
+
+
+    def _push_streams(self, client):
+        update = KRPC.StreamUpdate()
+        with client.lock:
+            for stream_id in client.started:
+                result = self._call(client, client.streams[stream_id])
+                value = result.SerializeToString()
+                if client.last_values.get(stream_id) != value:
+                    client.last_values[stream_id] = value
+                    update.results.add(id=stream_id, result=result)
+        if not update.results:
+            return
+        try:
+            self._send_message(client.stream_socket, update)
+            self.stream_update_count += 1
+        except OSError:
+            client.stream_socket = None
+
+
+    # Procedures
+
+    def _object_id(self, obj):
+        if obj is None:
+            return 0
+        key = id(obj)
+        with self._objects_lock:
+            if key not in self._object_ids:
+                self._object_ids[key] = len(self._objects) + 1
+                self._objects[self._object_ids[key]] = obj
+            return self._object_ids[key]
+
+
+    def _object(self, object_id):
+        if object_id not in self._objects:
+            raise ProcedureError('No object with id %d' % object_id)
+        return self._objects[object_id]
+
+
+    def _get_services(self):
+        return KRPC.Services(services=[KRPC.Service(name='KRPC'), KRPC.Service(name='SpaceCenter')])
+
+
+    def _decode_argument(self, data, param_type):
+        if param_type is OBJECT:
+            return self._object(Decoder.decode(None, data, UINT64))
+        return Decoder.decode(None, data, param_type)
+
+
+    def _encode_result(self, value, return_type):
+        if return_type is MESSAGE:
+            return value.SerializeToString()
+        if return_type is OBJECT:
+            return Encoder.encode(self._object_id(value), UINT64)
+        if return_type is OBJECT_LIST:
+            return KRPC.List(items=[Encoder.encode(self._object_id(item), UINT64) for item in value]).SerializeToString()
+        return Encoder.encode(value, return_type)
+
+
+    def _call(self, client, call):
+        result = KRPC.ProcedureResult()
+        procedure = self._procedures.get((call.service, call.procedure))
+        try:
+            if procedure is None:
+                raise ProcedureError('Procedure %s.%s not found' % (call.service, call.procedure))
+            args = [None] * len(procedure.param_types)
+            for argument in call.arguments:
+                args[argument.position] = self._decode_argument(argument.value, procedure.param_types[argument.position])
+            func = procedure.func or getattr(self, '_' + call.procedure)
+            value = func(client, *args) if procedure.func is None else func(*args)
+            if procedure.return_type is not None:
+                result.value = self._encode_result(value, procedure.return_type)
+        except Exception as e:
+            # Like kRPC, a failing procedure is an error result: it must not end
+            # the stream thread, or the connection of the client
+            result.error.description = str(e)
+            if not isinstance(e, ProcedureError):
+                result.error.stack_trace = traceback.format_exc()
+        return result
+
+
+    def _GetClientID(self, client):
+        return client.identifier
+
+
+    def _AddStream(self, client, call, start):
+        key = call.SerializeToString()
+        with client.lock:
+            stream_id = client.stream_ids.get(key)
+            if stream_id is None:
+                stream_id = client.stream_ids[key] = self._next_stream_id
+                self._next_stream_id += 1
+                client.streams[stream_id] = call
+            if start:
+                client.started.add(stream_id)
+        return KRPC.Stream(id=stream_id)
+
+
+    def _StartStream(self, client, stream_id):
+        with client.lock:
+            if stream_id not in client.streams:
+                raise ProcedureError('No stream with id %d' % stream_id)
+            client.started.add(stream_id)
+
+
+    def _RemoveStream(self, client, stream_id):
+        with client.lock:
+            call = client.streams.pop(stream_id, None)
+            if call is not None:
+                del client.stream_ids[call.SerializeToString()]
+            client.started.discard(stream_id)
+            client.last_values.pop(stream_id, None)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--address', default='127.0.0.1')
+    parser.add_argument('--rpc-port', type=int, default=50000)
+    parser.add_argument('--stream-port', type=int, default=50001)
+    parser.add_argument('--vessels', help='number of simulated vessels', type=int, default=1)
+    parser.add_argument('--body', help='reference body of every vessel', default='kerbin')
+    parser.add_argument('--warp', help='time warp factor', type=float, default=1.)
+    parser.add_argument('--latency', help='added to every RPC response, in ms', type=float, default=0.)
+    parser.add_argument('--jitter', help='random +- latency variation, in ms', type=float, default=0.)
+    parser.add_argument('--stream-rate', help='stream updates per second', type=float, default=60.)
+    args = parser.parse_args()
+
+    simulation = KeplerSimulation(args.vessels, args.body, args.warp)
+    server = KrpcServer(simulation, args.address, args.rpc_port, args.stream_port,
+                        args.latency / 1000., args.jitter / 1000., args.stream_rate)
+    server.start()
+    print('Serving on %s, rpc port %d, stream port %d' % (args.address, server.rpc_port, server.stream_port))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+
+if __name__ == '__main__':
+    main()
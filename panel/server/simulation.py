@@ -0,0 +1,252 @@
+import math
+import random
+import time
+import numpy as np
+
+from panel.planet_data import BODIES
+from panel.telemetry import kepler
+
+
+
+# Right handed, z north, to krpc left handed, y north, coordinates
+_KRPC_AXES = [0, 2, 1]
+
+
+def _rotation_x(angle):
+    c, s = math.cos(angle), math.sin(angle)
+    return np.array([[1., 0., 0.], [0., c, -s], [0., s, c]])
+
+
+def _rotation_z(angle):
+    c, s = math.cos(angle), math.sin(angle)
+    return np.array([[c, -s, 0.], [s, c, 0.], [0., 0., 1.]])
+
+
+
+class SimBody(object):
+    def __init__(self, key):
+        body = BODIES.body(key)
+        self.name = body.name
+        self.mu = body.mu
+        self.equatorial_radius = body.radius
+        self.sphere_of_influence = body.soi
+        self.non_rotating_reference_frame = SimReferenceFrame(self)
+
+
+
+class SimReferenceFrame(object):
+    """
+    Non rotating frame centered on a body, the only frame simulated.
+    krpc frames are left handed: x along the reference direction, y toward the north pole.
+    """
+    REFERENCE_PLANE_DIRECTION = (1., 0., 0.)
+    REFERENCE_PLANE_NORMAL = (0., 1., 0.)
+
+    def __init__(self, body):
+        self.body = body
+
+
+
+class SimOrbit(object):
+    """
+    Fixed Keplerian orbit, every krpc Orbit value the panel reads is
+    computed at the simulation ut.
+    Angles in radians, distances in m, mean_anomaly_at_epoch at ut == 0.
+    """
+    def __init__(self, simulation, body, semi_major_axis, eccentricity, inclination=0.,
+                 longitude_of_ascending_node=0., argument_of_periapsis=0., mean_anomaly_at_epoch=0.):
+        self._simulation = simulation
+        self.body = body
+        self.semi_major_axis = semi_major_axis
+        self.eccentricity = eccentricity
+        self.inclination = inclination
+        self.longitude_of_ascending_node = longitude_of_ascending_node
+        self.argument_of_periapsis = argument_of_periapsis
+        self.mean_anomaly_at_epoch = mean_anomaly_at_epoch
+        self._n = float(kepler.mean_motion(body.mu, semi_major_axis))
+
+
+    @property
+    def _elliptic(self):
+        return self.eccentricity < 1
+
+
+    def _mean_anomaly(self, ut):
+        mean_anomaly = self.mean_anomaly_at_epoch + self._n * ut
+        if self._elliptic:
+            return mean_anomaly % (2 * math.pi)
+        return mean_anomaly
+
+
+    @property
+    def mean_anomaly(self):
+        return self._mean_anomaly(self._simulation.ut)
+
+
+    @property
+    def true_anomaly(self):
+        return float(kepler.true_anomaly(self.mean_anomaly, self.eccentricity))
+
+
+    @property
+    def radius(self):
+        return float(kepler.radius(self.semi_major_axis, self.eccentricity, self.true_anomaly))
+
+
+    @property
+    def speed(self):
+        return math.sqrt(self.body.mu * (2 / self.radius - 1 / self.semi_major_axis))
+
+
+    @property
+    def orbital_speed(self):
+        return self.speed
+
+
+    @property
+    def periapsis(self):
+        return self.semi_major_axis * (1 - self.eccentricity)
+
+
+    @property
+    def apoapsis(self):
+        return self.semi_major_axis * (1 + self.eccentricity)
+
+
+    @property
+    def periapsis_altitude(self):
+        return self.periapsis - self.body.equatorial_radius
+
+
+    @property
+    def apoapsis_altitude(self):
+        return self.apoapsis - self.body.equatorial_radius
+
+
+    @property
+    def semi_minor_axis(self):
+        return abs(self.semi_major_axis) * math.sqrt(abs(1 - self.eccentricity ** 2))
+
+
+    @property
+    def period(self):
+        if self._elliptic:
+            return 2 * math.pi / self._n
+        return float('nan')
+
+
+    @property
+    def time_to_periapsis(self):
+        if self._elliptic:
+            return (2 * math.pi - self.mean_anomaly) / self._n
+        return -self.mean_anomaly / self._n
+
+
+    @property
+    def time_to_apoapsis(self):
+        if self._elliptic:
+            return ((math.pi - self.mean_anomaly) % (2 * math.pi)) / self._n
+        return float('inf')
+
+
+    def state_vector(self):
+        """
+        Position and velocity at the simulation ut, in a right handed frame,
+        z normal to the reference plane and x along the reference direction.
+        """
+        true_anomaly = self.true_anomaly
+        p = self.semi_major_axis * (1 - self.eccentricity ** 2)
+        radius = p / (1 + self.eccentricity * math.cos(true_anomaly))
+        position = radius * np.array([math.cos(true_anomaly), math.sin(true_anomaly), 0.])
+        velocity = math.sqrt(self.body.mu / p) * np.array([-math.sin(true_anomaly),
+                                                          self.eccentricity + math.cos(true_anomaly), 0.])
+        rotation = np.matmul(np.matmul(_rotation_z(self.longitude_of_ascending_node), _rotation_x(self.inclination)),
+                             _rotation_z(self.argument_of_periapsis))
+        return np.matmul(rotation, position), np.matmul(rotation, velocity)
+
+
+    @property
+    def time_to_soi_change(self):
+        # Simulated vessels never leave their body SOI
+        return float('nan')
+
+
+    def ut_at_true_anomaly(self, true_anomaly):
+        ut = self._simulation.ut
+        delta = kepler.mean_anomaly(true_anomaly, self.eccentricity) - self._mean_anomaly(ut)
+        if self._elliptic:
+            delta %= 2 * math.pi
+        return ut + float(delta) / self._n
+
+
+
+class SimVessel(object):
+    def __init__(self, name, orbit):
+        self.name = name
+        self.orbit = orbit
+        # Simulated vessels only coast
+        self.thrust = 0.
+
+
+    def _check_frame(self, reference_frame):
+        if reference_frame.body is not self.orbit.body:
+            raise ValueError('Only the non rotating reference frame of the orbit body is simulated')
+
+
+    def position(self, reference_frame):
+        self._check_frame(reference_frame)
+        return tuple(self.orbit.state_vector()[0][_KRPC_AXES])
+
+
+    def velocity(self, reference_frame):
+        self._check_frame(reference_frame)
+        return tuple(self.orbit.state_vector()[1][_KRPC_AXES])
+
+
+
+class KeplerSimulation(object):
+    """
+    Vessels on fixed orbits around one body, ut advance with the wall clock times warp.
+    The first vessel is the active one.
+    """
+    def __init__(self, vessel_count=1, body='kerbin', warp=1.0, seed=0):
+        self.body = SimBody(body)
+        self.warp = warp
+        # When set, ut stays at this value, to compute snapshots at chosen times
+        self.frozen_ut = None
+        self._start_ut = 0.
+        self._start_time = time.monotonic()
+        rand = random.Random(seed)
+        self.vessels = [SimVessel('Vessel %d' % i, self._random_orbit(rand, i == 0))
+                        for i in range(vessel_count)]
+        self.active_vessel = self.vessels[0]
+
+
+    def _random_orbit(self, rand, active):
+        periapsis = self.body.equatorial_radius * rand.uniform(1.1, 1.5)
+        eccentricity = 0.3 if active else rand.uniform(0., 0.7)
+        return SimOrbit(self, self.body, periapsis / (1 - eccentricity), eccentricity,
+                        inclination=math.radians(rand.uniform(0., 30.)),
+                        longitude_of_ascending_node=rand.uniform(0., 2 * math.pi),
+                        argument_of_periapsis=rand.uniform(0., 2 * math.pi),
+                        mean_anomaly_at_epoch=rand.uniform(0., 2 * math.pi))
+
+
+    @property
+    def ut(self):
+        if self.frozen_ut is not None:
+            return self.frozen_ut
+        return self._start_ut + (time.monotonic() - self._start_time) * self.warp
+
+
+    def set_warp(self, warp):
+        self._start_ut = self.ut
+        self._start_time = time.monotonic()
+        self.warp = warp
+
+
+    def wall_time_at(self, ut):
+        """
+        time.monotonic() value when the simulation reached ut
+        """
+        return self._start_time + (ut - self._start_ut) / self.warp
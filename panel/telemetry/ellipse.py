@@ -1,10 +1,12 @@
 import numpy as np
 
 from panel.planet_data import PLANET_DATA
-from panel.telemetry.telemetry import Telemetry
+from panel.telemetry.telemetry import Telemetry, telemetry_cache
 
 
 class EllipseData(Telemetry):
+    # No new slot, objects can switch between Telemetry and its subclasses
+    __slots__ = ()
 
     @property
     def _c(self):
@@ -37,3 +39,15 @@ class EllipseData(Telemetry):
     def proj_equ_height(self):
         x, y = self.projection(0, self.height)
         return np.sqrt(x**2 + y**2)
+
+
+    @telemetry_cache('apoapsis', 'periapsis', 'semi_major_axis', 'semi_minor_axis', 'projection_matrix')
+    def orbit_bounds(self):
+        """
+        (xmin, xmax, ymin, ymax) of the projected ellipse
+        """
+        matrix = self.projection_matrix
+        center_x, center_y = np.matmul(matrix, (-self.focus_x, -self.focus_y))
+        half_x = np.hypot(matrix[0, 0] * self.semi_major_axis, matrix[0, 1] * self.semi_minor_axis)
+        half_y = np.hypot(matrix[1, 0] * self.semi_major_axis, matrix[1, 1] * self.semi_minor_axis)
+        return (center_x - half_x, center_x + half_x, center_y - half_y, center_y + half_y)
@@ -0,0 +1,92 @@
+import numpy as np
+from collections import namedtuple
+
+from panel.planet_data import BODIES
+from panel.telemetry import kepler
+from panel.telemetry.hyperbole import HYPERBOLE_MAX_ANOMALY
+
+
+# Orbital elements of the other vessels, one array per element with one value per vessel
+FLEET_ELEMENTS = (
+    'semi_major_axis',
+    'eccentricity',
+    'inclination',
+    'longitude_of_ascending_node',
+    'argument_of_periapsis',
+    'mean_anomaly',
+)
+
+# Vessels orbiting the body ref_body_id at ut, elements in the orbit_from_state_vector frame
+FleetSnapshot = namedtuple('FleetSnapshot', ('ut', 'ref_body_id', 'names') + FLEET_ELEMENTS)
+
+# Points per orbit curve
+FLEET_SAMPLES = 65
+_UNIT_SAMPLES = np.linspace(-1., 1., FLEET_SAMPLES)
+
+
+def fleet_from_state_vectors(ut, ref_body_id, names, positions, velocities):
+    """
+    positions (m) and velocities (m/s) of shape (n, 3), in the right handed frame of the body
+    """
+    orbit = kepler.orbit_from_state_vector(BODIES.mu[ref_body_id], np.reshape(positions, (-1, 3)),
+                                           np.reshape(velocities, (-1, 3)))
+    return FleetSnapshot(ut, ref_body_id, tuple(names), *(orbit[name] for name in FLEET_ELEMENTS))
+
+
+
+class FleetGeometry(object):
+    """
+    Orbits of a FleetSnapshot, computed once for every vessel: the orbit curves and
+    the vessel positions are in the perifocal plane of each vessel, periapsis along x,
+    project() maps them on the display.
+    """
+    def __init__(self, fleet):
+        self.fleet = fleet
+        a = fleet.semi_major_axis
+        e = fleet.eccentricity
+        self._elliptic = e < 1
+        self._mean_motion = kepler.mean_motion(BODIES.mu[fleet.ref_body_id], a)
+        self._p = a * (1 - e ** 2)
+        # Rows P and Q of each vessel, shape (n, 2, 3)
+        self.basis = kepler.perifocal_basis(fleet.longitude_of_ascending_node, fleet.inclination,
+                                            fleet.argument_of_periapsis)
+        self.curves = self._curves(a, e, BODIES.soi[fleet.ref_body_id])
+
+
+    def _curves(self, a, e, soi):
+        # Ellipses over the eccentric anomaly, hyperbolas over the hyperbolic anomaly
+        # up to 3 times the SOI radius like OrbitHyperbole
+        elliptic = self._elliptic[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            limit = np.fmin(np.arccosh((soi * 3 / -a + 1) / e), HYPERBOLE_MAX_ANOMALY)
+            anomaly = _UNIT_SAMPLES * np.where(self._elliptic, np.pi, limit)[:, None]
+            x = np.where(elliptic, np.cos(anomaly), np.cosh(anomaly)) - e[:, None]
+            y = np.where(elliptic, np.sqrt(1 - e ** 2)[:, None] * np.sin(anomaly),
+                         -np.sqrt(e ** 2 - 1)[:, None] * np.sinh(anomaly))
+        return np.stack([x, y], axis=-1) * a[:, None, None]
+
+
+    def __len__(self):
+        return len(self.fleet.names)
+
+
+    def positions(self, ut):
+        """
+        Vessel positions at ut, shape (n, 2)
+        """
+        fleet = self.fleet
+        mean_anomaly = fleet.mean_anomaly + self._mean_motion * (ut - fleet.ut)
+        true_anomaly = kepler.true_anomalies(mean_anomaly, fleet.eccentricity)
+        radius = self._p / (1 + fleet.eccentricity * np.cos(true_anomaly))
+        return np.stack([radius * np.cos(true_anomaly), radius * np.sin(true_anomaly)], axis=-1)
+
+
+    def project(self, matrix, points):
+        """
+        matrix of shape (2, 3) maps the body frame on the display, points of shape (n, 2) or (n, s, 2)
+        """
+        # Perifocal to display matrix of each vessel, transposed, shape (n, 2, 2)
+        display = np.matmul(self.basis, matrix.T)
+        if points.ndim == 2:
+            return np.matmul(points[:, None], display)[:, 0]
+        return np.matmul(points, display)
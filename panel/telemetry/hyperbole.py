@@ -1,25 +1,30 @@
 import numpy as np
 
-from panel.planet_data import PLANET_DATA
+from panel.planet_data import BODIES
 from panel.telemetry.telemetry import Telemetry, telemetry_cache
 
 
+# The trajectory is sampled uniformly in hyperbolic anomaly: dense near the
+# periapsis where the curvature is high, sparse along the asymptotes
+HYPERBOLE_SAMPLES = 41
+_UNIT_SAMPLES = np.linspace(-1, 1, HYPERBOLE_SAMPLES)
+# Bound the trajectory when the SOI limit is not defined, cosh(8) ~ 1490
+HYPERBOLE_MAX_ANOMALY = 8.0
+# Key of the perifocal points buffer in the telemetry _cache dict
+_POINTS_BUFFER = 'hyperbole perifocal points'
 
-class HyperboleData(Telemetry):
-
-    @property
-    def _c3(self):
-        # https://en.wikipedia.org/wiki/Hyperbolic_trajectory
-        return self.speed**2 - 2 * PLANET_DATA[self.ref_body_name]['mu'] * 10**9 / self.radius
 
+class HyperboleData(Telemetry):
+    __slots__ = ()
 
     @property
     def _a(self):
-        # https://en.wikipedia.org/wiki/Characteristic_energy
-        return -PLANET_DATA[self.ref_body_name]['mu'] * 10**9 / self._c3
+        # Negative for an hyperbola. Deriving it from speed and radius would change
+        # it, and every sample depending on it, on each frame along the trajectory
+        return self.semi_major_axis
 
 
-    @property
+    @telemetry_cache('semi_major_axis', 'eccentricity')
     def _l(self):
         # https://en.wikipedia.org/wiki/Characteristic_energy
         return self._a * (1 - self.eccentricity**2)
@@ -30,55 +35,59 @@ class HyperboleData(Telemetry):
         return self._l
 
 
-    @property
-    @telemetry_cache('eccentricity', '_l')
+    @telemetry_cache('semi_major_axis', 'eccentricity', 'ref_body_id')
     def _limit_soi(self):
-        return np.arccos((self._l / (PLANET_DATA[self.ref_body_name]['soi']*1000*3) - 1) / self.eccentricity)
-
-
-    @property
-    @telemetry_cache('eccentricity')
-    def _limit_asymp(self):
-        return np.arccos(-1 / self.eccentricity)
+        # Hyperbolic anomaly where the trajectory reaches 3 times the SOI radius, r = -a * (e * cosh(F) - 1)
+        return np.arccosh((BODIES.bodies[self.ref_body_id].soi * 3 / -self._a + 1) / self.eccentricity)
 
 
-    @property
+    @telemetry_cache('_limit_soi')
     def _limit(self):
-        if self._limit_soi < self._limit_asymp:
-            return self._limit_soi
-        return self._limit_asymp
+        # fmin ignore nan, when the SOI limit can not be reached
+        return np.fmin(self._limit_soi, HYPERBOLE_MAX_ANOMALY)
 
 
-    @property
     @telemetry_cache('_limit')
-    def _t(self):
-        return np.linspace(-self._limit, self._limit, num=100)
-
-
-    @property
-    @telemetry_cache('eccentricity', '_l', '_t')
-    def _r(self):
-        # https://en.wikipedia.org/wiki/Characteristic_energy
-        return  self._l / (1 + self.eccentricity * np.cos(self._t))
+    def _f(self):
+        return _UNIT_SAMPLES * self._limit
 
 
-    @property
-    @telemetry_cache('_r', '_t')
-    def _xx(self):
-        return self._r * np.cos(self._t)
+    @telemetry_cache('semi_major_axis', 'eccentricity', '_f')
+    def perifocal_points(self):
+        """
+        Trajectory samples in the orbit plane, periapsis along x, shape (2, HYPERBOLE_SAMPLES)
+        """
+        # https://en.wikipedia.org/wiki/Hyperbolic_trajectory
+        # One buffer per telemetry, HyperboleData has no slot of its own: it is
+        # updated in place, each recompute bumps the cache version anyway
+        points = self._cache.get(_POINTS_BUFFER)
+        if points is None:
+            points = self._cache[_POINTS_BUFFER] = np.empty((2, HYPERBOLE_SAMPLES))
+        x, y = points
+        np.cosh(self._f, out=x)
+        np.subtract(self.eccentricity, x, out=x)
+        np.sinh(self._f, out=y)
+        y *= np.sqrt(self.eccentricity**2 - 1)
+        points *= -self._a
+        return points
 
 
-    @property
-    @telemetry_cache('_r', '_t')
-    def _yy(self):
-        return self._r * np.sin(self._t)
+    @telemetry_cache('perifocal_points', 'projection_matrix')
+    def hyperbole_points(self):
+        return self.project_points(self.perifocal_points)
 
 
     @property
     def hyperbole_x(self):
-        return  self._xx * self.cos_longitude_of_periapsis - self._yy * self.sin_longitude_of_periapsis
+        return self.hyperbole_points[0]
 
 
     @property
     def hyperbole_y(self):
-        return self._xx * self.sin_longitude_of_periapsis + self._yy * self.cos_longitude_of_periapsis
+        return self.hyperbole_points[1]
+
+
+    @telemetry_cache('hyperbole_points')
+    def orbit_bounds(self):
+        x, y = self.hyperbole_points
+        return (x.min(), x.max(), y.min(), y.max())
@@ -0,0 +1,196 @@
+import numpy as np
+
+
+
+# Newton iterations stop once every step is under KEPLER_TOLERANCE (rad),
+# near parabolic orbits need the most iterations
+KEPLER_TOLERANCE = 1e-13
+KEPLER_MAX_ITERATIONS = 60
+
+
+def mean_motion(mu, semi_major_axis):
+    """
+    mu in m3/s2, semi_major_axis in m, negative for an hyperbola. Return rad/s
+    """
+    return np.sqrt(mu / np.abs(semi_major_axis) ** 3)
+
+
+def eccentric_anomaly(mean_anomaly, eccentricity):
+    """
+    Solve Kepler's equation M = E - e sin(E), for e < 1.
+    """
+    mean_anomaly = np.remainder(mean_anomaly + np.pi, 2 * np.pi) - np.pi
+    E = mean_anomaly + eccentricity * np.sin(mean_anomaly)
+    E = np.where(eccentricity > 0.8, np.pi * np.sign(mean_anomaly), E)
+    for _ in range(KEPLER_MAX_ITERATIONS):
+        step = (E - eccentricity * np.sin(E) - mean_anomaly) / (1 - eccentricity * np.cos(E))
+        E = E - step
+        if np.all(np.abs(step) < KEPLER_TOLERANCE):
+            break
+    return E
+
+
+def hyperbolic_anomaly(mean_anomaly, eccentricity):
+    """
+    Solve the hyperbolic Kepler's equation M = e sinh(F) - F, for e > 1.
+    """
+    # Cube root start for small anomalies, where the orbit looks like a parabola
+    F = np.where(np.abs(mean_anomaly) < 1, np.cbrt(6 * mean_anomaly / eccentricity),
+                 np.arcsinh(mean_anomaly / eccentricity))
+    for _ in range(KEPLER_MAX_ITERATIONS):
+        step = (eccentricity * np.sinh(F) - F - mean_anomaly) / (eccentricity * np.cosh(F) - 1)
+        F = F - step
+        if np.all(np.abs(step) < KEPLER_TOLERANCE * np.maximum(1, np.abs(F))):
+            break
+    return F
+
+
+def true_anomaly(mean_anomaly, eccentricity):
+    if eccentricity < 1:
+        E = eccentric_anomaly(mean_anomaly, eccentricity)
+        return 2 * np.arctan2(np.sqrt(1 + eccentricity) * np.sin(E / 2), np.sqrt(1 - eccentricity) * np.cos(E / 2))
+    F = hyperbolic_anomaly(mean_anomaly, eccentricity)
+    return 2 * np.arctan2(np.sqrt(eccentricity + 1) * np.sinh(F / 2), np.sqrt(eccentricity - 1) * np.cosh(F / 2))
+
+
+def true_anomalies(mean_anomaly, eccentricity):
+    """
+    true_anomaly of arrays mixing ellipses and hyperbolas, each kind solved at once
+    """
+    mean_anomaly, eccentricity = np.broadcast_arrays(mean_anomaly, eccentricity)
+    result = np.empty(mean_anomaly.shape)
+    elliptic = eccentricity < 1
+    e = eccentricity[elliptic]
+    E = eccentric_anomaly(mean_anomaly[elliptic], e)
+    result[elliptic] = 2 * np.arctan2(np.sqrt(1 + e) * np.sin(E / 2), np.sqrt(1 - e) * np.cos(E / 2))
+    hyperbolic = ~elliptic
+    e = eccentricity[hyperbolic]
+    F = hyperbolic_anomaly(mean_anomaly[hyperbolic], e)
+    result[hyperbolic] = 2 * np.arctan2(np.sqrt(e + 1) * np.sinh(F / 2), np.sqrt(e - 1) * np.cosh(F / 2))
+    return result
+
+
+def mean_anomaly(true_anomaly, eccentricity):
+    """
+    Mean anomaly in ]-pi, pi] for an ellipse, unbounded for an hyperbola.
+    """
+    if eccentricity < 1:
+        E = 2 * np.arctan2(np.sqrt(1 - eccentricity) * np.sin(true_anomaly / 2),
+                           np.sqrt(1 + eccentricity) * np.cos(true_anomaly / 2))
+        return E - eccentricity * np.sin(E)
+    # nan beyond the asymptotes
+    with np.errstate(invalid='ignore'):
+        F = 2 * np.arctanh(np.sqrt((eccentricity - 1) / (eccentricity + 1)) * np.tan(true_anomaly / 2))
+    return eccentricity * np.sinh(F) - F
+
+
+def time_of_flight(true_anomaly_from, true_anomaly_to, eccentricity, mean_motion):
+    """
+    Time from true_anomaly_from to the next pass at true_anomaly_to, mean_motion in rad/s.
+    Negative if an hyperbola passed true_anomaly_to, nan if it never reach it.
+    """
+    delta = mean_anomaly(true_anomaly_to, eccentricity) - mean_anomaly(true_anomaly_from, eccentricity)
+    if eccentricity < 1:
+        delta = np.remainder(delta, 2 * np.pi)
+    return delta / mean_motion
+
+
+def radius(semi_major_axis, eccentricity, true_anomaly):
+    return semi_major_axis * (1 - eccentricity ** 2) / (1 + eccentricity * np.cos(true_anomaly))
+
+
+def perifocal_basis(longitude_of_ascending_node, inclination, argument_of_periapsis):
+    """
+    Unit vectors toward the periapsis (P) and 90° ahead in the orbit plane (Q), in the
+    frame orbit_from_state_vector takes: shape (..., 2, 3), rows P and Q.
+    """
+    cos_lan, sin_lan = np.cos(longitude_of_ascending_node), np.sin(longitude_of_ascending_node)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+    cos_ap, sin_ap = np.cos(argument_of_periapsis), np.sin(argument_of_periapsis)
+    p = np.stack([cos_lan * cos_ap - sin_lan * sin_ap * cos_i,
+                  sin_lan * cos_ap + cos_lan * sin_ap * cos_i,
+                  sin_ap * sin_i], axis=-1)
+    q = np.stack([-cos_lan * sin_ap - sin_lan * cos_ap * cos_i,
+                  -sin_lan * sin_ap + cos_lan * cos_ap * cos_i,
+                  cos_ap * sin_i], axis=-1)
+    return np.stack([p, q], axis=-2)
+
+
+def _dot(a, b):
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1] + a[..., 2] * b[..., 2]
+
+
+def _cross(a, b):
+    # np.cross is an order of magnitude slower on small arrays
+    return np.stack([a[..., 1] * b[..., 2] - a[..., 2] * b[..., 1],
+                     a[..., 2] * b[..., 0] - a[..., 0] * b[..., 2],
+                     a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]], axis=-1)
+
+
+def orbit_from_state_vector(mu, position, velocity):
+    """
+    Orbit of a body at position (m) with velocity (m/s), in a right handed frame
+    with z normal to the reference plane and x along the reference direction.
+    position and velocity have shape (..., 3), every orbit is solved at once.
+    Return a dict of arrays of shape (...), named like the krpc Orbit attributes.
+    Angles in radians, the longitude of ascending node is 0 on equatorial orbits
+    and the argument of periapsis is 0 on circular ones.
+    """
+    position = np.asarray(position, dtype=float)
+    velocity = np.asarray(velocity, dtype=float)
+    radius = np.sqrt(_dot(position, position))
+    speed = np.sqrt(_dot(velocity, velocity))
+    h = _cross(position, velocity)
+    h_norm = np.sqrt(_dot(h, h))
+    h_unit = h / h_norm[..., None]
+    e_vector = ((speed ** 2 - mu / radius)[..., None] * position
+                - _dot(position, velocity)[..., None] * velocity) / mu
+    eccentricity = np.sqrt(_dot(e_vector, e_vector))
+    with np.errstate(divide='ignore'):
+        semi_major_axis = 1 / (2 / radius - speed ** 2 / mu)
+
+    # Ascending node direction, z x h, x axis when the orbit is equatorial
+    node_norm = np.hypot(h[..., 0], h[..., 1])
+    equatorial = node_norm < 1e-12 * h_norm
+    node = np.stack([np.where(equatorial, 1., -h[..., 1] / np.where(equatorial, 1., node_norm)),
+                     np.where(equatorial, 0., h[..., 0] / np.where(equatorial, 1., node_norm)),
+                     np.zeros_like(node_norm)], axis=-1)
+    # Periapsis direction, the ascending node when the orbit is circular
+    circular = eccentricity < 1e-12
+    periapsis = np.where(circular[..., None], node, e_vector / np.where(circular, 1., eccentricity)[..., None])
+
+    inclination = np.arccos(np.clip(h[..., 2] / h_norm, -1, 1))
+    longitude_of_ascending_node = np.remainder(np.arctan2(node[..., 1], node[..., 0]), 2 * np.pi)
+    argument_of_periapsis = np.remainder(
+        np.arctan2(_dot(_cross(node, periapsis), h_unit), _dot(node, periapsis)), 2 * np.pi)
+    true_anomaly = np.arctan2(_dot(_cross(periapsis, position), h_unit), _dot(periapsis, position))
+
+    elliptic = eccentricity < 1
+    n = mean_motion(mu, semi_major_axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        E = 2 * np.arctan2(np.sqrt(1 - eccentricity) * np.sin(true_anomaly / 2),
+                           np.sqrt(1 + eccentricity) * np.cos(true_anomaly / 2))
+        F = 2 * np.arctanh(np.sqrt((eccentricity - 1) / (eccentricity + 1)) * np.tan(true_anomaly / 2))
+        mean_anomaly = np.where(elliptic, np.remainder(E - eccentricity * np.sin(E), 2 * np.pi),
+                                eccentricity * np.sinh(F) - F)
+        period = np.where(elliptic, 2 * np.pi / n, np.nan)
+        time_to_periapsis = np.where(elliptic, 2 * np.pi - mean_anomaly, -mean_anomaly) / n
+        time_to_apoapsis = np.where(elliptic, np.remainder(np.pi - mean_anomaly, 2 * np.pi) / n, np.inf)
+    return {
+        'eccentricity': eccentricity,
+        'semi_major_axis': semi_major_axis,
+        'semi_minor_axis': np.abs(semi_major_axis) * np.sqrt(np.abs(1 - eccentricity ** 2)),
+        'periapsis': semi_major_axis * (1 - eccentricity),
+        'apoapsis': semi_major_axis * (1 + eccentricity),
+        'inclination': inclination,
+        'longitude_of_ascending_node': longitude_of_ascending_node,
+        'argument_of_periapsis': argument_of_periapsis,
+        'true_anomaly': true_anomaly,
+        'mean_anomaly': mean_anomaly,
+        'period': period,
+        'time_to_periapsis': time_to_periapsis,
+        'time_to_apoapsis': time_to_apoapsis,
+        'radius': radius,
+        'speed': speed,
+        'orbital_speed': speed,
+    }
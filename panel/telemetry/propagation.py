@@ -0,0 +1,91 @@
+import math
+
+from panel.planet_data import BODIES
+from panel.telemetry import kepler
+
+
+
+def body_mu(name):
+    """
+    Gravitational parameter of the body name, None for a body missing from BODIES
+    """
+    body_id = BODIES.ids.get(name)
+    return None if body_id is None else BODIES.bodies[body_id].mu
+
+
+
+def propagate(snapshot, ut, mu):
+    """
+    Return the snapshot moved along its orbit to ut, the orbit itself is unchanged.
+    Only the values depending on the vessel position are recomputed.
+    mu: gravitational parameter of the snapshot reference body
+    """
+    dt = ut - snapshot.ut
+    eccentricity = snapshot.eccentricity
+    semi_major_axis = snapshot.semi_major_axis
+    if eccentricity < 1:
+        period = snapshot.period
+        n = 2 * math.pi / period
+        mean_anomaly = (snapshot.mean_anomaly + n * dt) % (2 * math.pi)
+        time_to_periapsis = (2 * math.pi - mean_anomaly) / n
+        time_to_apoapsis = ((math.pi - mean_anomaly) % (2 * math.pi)) / n
+        time_to_ascending_node = (snapshot.time_to_ascending_node - dt) % period
+        time_to_descending_node = (snapshot.time_to_descending_node - dt) % period
+    elif eccentricity > 1:
+        n = float(kepler.mean_motion(mu, semi_major_axis))
+        mean_anomaly = snapshot.mean_anomaly + n * dt
+        time_to_periapsis = snapshot.time_to_periapsis - dt
+        time_to_apoapsis = snapshot.time_to_apoapsis
+        time_to_ascending_node = snapshot.time_to_ascending_node - dt
+        time_to_descending_node = snapshot.time_to_descending_node - dt
+    else:
+        # Parabola, not displayed by the MFD
+        return snapshot._replace(ut=ut)
+
+    true_anomaly = float(kepler.true_anomaly(mean_anomaly, eccentricity))
+    radius = float(kepler.radius(semi_major_axis, eccentricity, true_anomaly))
+    speed = math.sqrt(mu * (2 / radius - 1 / semi_major_axis))
+    return snapshot._replace(
+        ut=ut,
+        mean_anomaly=mean_anomaly,
+        true_anomaly=true_anomaly,
+        radius=radius,
+        speed=speed,
+        orbital_speed=speed,
+        time_to_periapsis=time_to_periapsis,
+        time_to_apoapsis=time_to_apoapsis,
+        time_to_ascending_node=time_to_ascending_node,
+        time_to_descending_node=time_to_descending_node,
+    )
+
+
+
+class KeplerPropagator(object):
+    """
+    Keep the latest received snapshot to display the vessel between samples.
+    The ut rate (time warp) is measured between consecutive samples.
+    Samples around a body missing from BODIES are not propagated.
+    """
+    def __init__(self):
+        self.sample = None
+        self.sample_time = None
+        self.ut_rate = 1.0
+        self._mu = None
+
+
+    def update(self, snapshot, now):
+        """
+        now: perf_counter time the snapshot was read
+        """
+        if self.sample is not None and now > self.sample_time and snapshot.ut >= self.sample.ut:
+            self.ut_rate = (snapshot.ut - self.sample.ut) / (now - self.sample_time)
+        if self.sample is None or snapshot.ref_body_name != self.sample.ref_body_name:
+            self._mu = body_mu(snapshot.ref_body_name)
+        self.sample = snapshot
+        self.sample_time = now
+
+
+    def snapshot(self, now):
+        if self.sample is None or self._mu is None:
+            return None
+        return propagate(self.sample, self.sample.ut + (now - self.sample_time) * self.ut_rate, self._mu)
@@ -0,0 +1,156 @@
+import json
+import queue
+import struct
+import threading
+import time
+import numpy as np
+
+from panel.planet_data import BODIES
+from panel.telemetry.telemetry import TelemetrySnapshot, TELEMETRY_FIELDS
+
+
+
+# File layout: MAGIC, header length (u4 little endian), json header padded to
+# RECORD_ALIGN bytes, then fixed width records appended one after the other.
+MAGIC = b'KSPTLM02'
+RECORD_ALIGN = 8
+# Longer body names, of modded bodies, are recorded truncated
+BODY_NAME_SIZE = max([16] + [len(name.encode('utf-8')) for name in BODIES.names])
+
+# wall_time is the recorder clock, in seconds, used to replay at the recorded pace.
+# Bit i of none_mask is set when TELEMETRY_FIELDS[i] was None, like the apoapsis of an
+# escape trajectory, the value is then stored as NaN (or an empty body name).
+RECORD_DTYPE = np.dtype(
+    [('wall_time', '<f8'), ('none_mask', '<u8')] +
+    [(name, 'S%d' % BODY_NAME_SIZE if name == 'ref_body_name' else '<f8') for name in TELEMETRY_FIELDS]
+)
+assert len(TELEMETRY_FIELDS) <= 64
+
+
+
+def _header(dtype):
+    header = json.dumps({'fields': dtype.descr}).encode('ascii')
+    header += b' ' * (-(len(MAGIC) + 4 + len(header)) % RECORD_ALIGN)
+    return MAGIC + struct.pack('<I', len(header)) + header
+
+
+
+class TelemetryRecorder(object):
+    """
+    Append snapshots to a recording file.
+    record() only queues the snapshot, packing and writing are done in batches
+    by a background thread so the telemetry thread never waits on the disk.
+    A write error stops the recording, it is reported by close().
+    """
+    def __init__(self, path):
+        self.path = path
+        self.record_count = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._file = open(path, 'wb')
+        self._file.write(_header(RECORD_DTYPE))
+        self._thread = threading.Thread(target=self._write_loop, name='TelemetryRecorder', daemon=True)
+        self._thread.start()
+
+
+    def record(self, snapshot):
+        if self.error is not None:
+            return
+        self._queue.put((time.monotonic(), snapshot))
+
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        try:
+            self._file.close()
+        except OSError as e:
+            # Flushing what a failed write left in the buffer
+            self.error = self.error or e
+        if self.error is not None:
+            print('Recording %s stopped after %d records: %s' % (self.path, self.record_count, self.error))
+
+
+    def _write_loop(self):
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    # Disk full...: later records are dropped instead of queued
+                    self.error = e
+                    return
+
+
+    def _write(self, batch):
+        records = np.empty(len(batch), dtype=RECORD_DTYPE)
+        for record, (wall_time, snapshot) in zip(records, batch):
+            none_mask = 0
+            for i, (name, value) in enumerate(zip(TELEMETRY_FIELDS, snapshot)):
+                if value is None:
+                    none_mask |= 1 << i
+                    value = b'' if name == 'ref_body_name' else np.nan
+                elif name == 'ref_body_name':
+                    value = value.encode('utf-8')[:BODY_NAME_SIZE]
+                record[name] = value
+            record['wall_time'] = wall_time
+            record['none_mask'] = none_mask
+        self._file.write(records.tobytes())
+        self._file.flush()
+        self.record_count += len(batch)
+
+
+
+class TelemetryRecording(object):
+    """
+    Read only, memory-mapped view of a recording file.
+    Records are fixed width rows, a column is a strided view over the mapping.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError('%s is not a telemetry recording' % path)
+            header_size, = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_size).decode('ascii'))
+            f.seek(0, 2)
+            file_size = f.tell()
+        self.dtype = np.dtype([tuple(field) for field in header['fields']])
+        offset = len(MAGIC) + 4 + header_size
+        # A record being written when the recorder stopped is ignored
+        count = (file_size - offset) // self.dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=self.dtype, mode='r', offset=offset, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=self.dtype)
+
+
+    def __len__(self):
+        return len(self.records)
+
+
+    def __getitem__(self, name):
+        return self.records[name]
+
+
+    def snapshot(self, index):
+        record = self.records[index]
+        none_mask = int(record['none_mask'])
+        return TelemetrySnapshot._make(
+            None if none_mask >> i & 1 else
+            record[name].decode('utf-8', 'ignore') if name == 'ref_body_name' else float(record[name])
+            for i, name in enumerate(TELEMETRY_FIELDS)
+        )
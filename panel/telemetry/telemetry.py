@@ -1,9 +1,79 @@
 import functools
 import numpy as np
+from collections import namedtuple
 from enum import Enum
 
-from panel.planet_data import PLANET_DATA
-
+from panel.planet_data import BODIES
+from panel.telemetry import kepler
+
+
+
+# Orbit attributes copied as is from a krpc Orbit
+ORBIT_FIELDS = (
+    'apoapsis_altitude',
+    'periapsis_altitude',
+    'eccentricity',
+    'time_to_apoapsis',
+    'time_to_periapsis',
+    'period',
+    'inclination',
+    'longitude_of_ascending_node',
+    'argument_of_periapsis',
+    'apoapsis',
+    'periapsis',
+    'semi_major_axis',
+    'semi_minor_axis',
+    'radius',
+    'orbital_speed',
+    'speed',
+    'true_anomaly',
+    'mean_anomaly',
+)
+
+# Orbit values read each fast poll: the vessel position along the orbit and the orbit
+# shape, a burn changes the shape and the drawn orbit must keep up with the vessel.
+# The orbit plane and the reference body are only read by the slow polls.
+FAST_ORBIT_FIELDS = (
+    'apoapsis_altitude',
+    'periapsis_altitude',
+    'eccentricity',
+    'time_to_apoapsis',
+    'time_to_periapsis',
+    'period',
+    'argument_of_periapsis',
+    'apoapsis',
+    'periapsis',
+    'semi_major_axis',
+    'semi_minor_axis',
+    'radius',
+    'orbital_speed',
+    'speed',
+    'true_anomaly',
+    'mean_anomaly',
+)
+
+# Every value received from ksp for a frame
+TELEMETRY_FIELDS = ('ut',) + ORBIT_FIELDS + (
+    'ref_body_name',
+    'time_to_ascending_node',
+    'time_to_descending_node',
+)
+
+# Set along with a telemetry field, not part of a frame
+RESOLVED_FIELDS = (
+    # BODIES id of ref_body_name, None for an unknown body
+    'ref_body_id',
+)
+
+# Display settings, versioned like telemetry fields but not part of a frame
+VIEW_FIELDS = (
+    'projection_mode',
+)
+
+FIELDS = TELEMETRY_FIELDS + RESOLVED_FIELDS + VIEW_FIELDS
+
+# Immutable copy of a Telemetry frame, safe to hand over to another thread
+TelemetrySnapshot = namedtuple('TelemetrySnapshot', TELEMETRY_FIELDS)
 
 
 
@@ -27,54 +97,142 @@ class PROJECTION(bytes, Enum):
 
 
 
-def telemetry_cache(*checks):
-    def inner_function(func):
+def _changed(old, new):
+    # Arrays are never compared, they may even be updated in place
+    if isinstance(old, np.ndarray) or isinstance(new, np.ndarray):
+        return True
+    # nan != nan, but it is not a change
+    return old != new and (old == old or new == new)
 
-        def init_cache(obj, key):
-            if not '__cache_values' in obj.__dict__:
-                obj.__dict__['__cache_values'] = {}
-            if not key in obj.__dict__['__cache_values']:
-                obj.__cache_values[key] = {
-                    'current_value': None
-                }
-
-        def need_recalculate(obj, key, checks):
-            need_recalculate = False
-            for check in checks:
-                if obj.__cache_values[key].get(check) != getattr(obj, check):
-                    obj.__cache_values[key][check] = getattr(obj, check)
-                    need_recalculate = True
-            return need_recalculate
-
-        @functools.wraps(func)
-        def wrap(self, *args, **kwargs):
-            key = func.__name__
-            init_cache(self, key)
-            if need_recalculate(self, key, checks):
-                self.__cache_values[key]['current_value'] = func(self, *args, **kwargs)
-            return self.__cache_values[key]['current_value']
-        return wrap
-    return inner_function
 
 
+class TelemetryField(object):
+    """
+    Raw telemetry value, stored in the Telemetry _values list.
+    Its version is incremented each time a different value is set.
+    """
+    __slots__ = ('name', 'index')
 
-class Telemetry(object):
-    def __init__(self):
-        self.__dict__['_telemetry'] = {}
-        self.projection_mode = PROJECTION.SHIP
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj._values[self.index]
+
+
+    def __set__(self, obj, value):
+        old = obj._values[self.index]
+        if old is not value and _changed(old, value):
+            obj._values[self.index] = value
+            obj._versions[self.index] += 1
+            obj._epoch += 1
+
+
+    def version(self, obj):
+        return obj._versions[self.index]
 
 
-    def __getattr__(self, name):
-        if name in self._telemetry:
-            return self._telemetry.get(name)
-        return getattr(self, name)
 
+class BodyNameField(TelemetryField):
+    """
+    ref_body_name, resolving ref_body_id when the name changes
+    """
+    __slots__ = ('id_field',)
 
-    def __setattr__(self, name, value):
-        if name in self.__dir__():
-            object.__setattr__(self, name, value)
+    def __init__(self, name, index, id_field):
+        TelemetryField.__init__(self, name, index)
+        self.id_field = id_field
+
+
+    def __set__(self, obj, value):
+        old = obj._values[self.index]
+        TelemetryField.__set__(self, obj, value)
+        if obj._values[self.index] is not old:
+            self.id_field.__set__(obj, BODIES.ids.get(value))
+
+
+
+class TelemetryCache(object):
+    """
+    Derived value computed from telemetry fields or other cached values.
+    The versions of the dependencies are recorded with the value, it is
+    computed again only when one of these versions changed.
+    """
+    def __init__(self, func, dependencies):
+        functools.update_wrapper(self, func)
+        self._func = func
+        self._dependency_names = dependencies
+        self._dependencies = None
+        self._owner = None
+
+
+    def __set_name__(self, owner, name):
+        self._owner = owner
+
+
+    def _resolve(self):
+        dependencies = tuple(getattr(self._owner, name) for name in self._dependency_names)
+        for name, dependency in zip(self._dependency_names, dependencies):
+            if not isinstance(dependency, (TelemetryField, TelemetryCache)):
+                raise TypeError('%s.%s can not depend on %s, it is not a telemetry field or cache'
+                                % (self._owner.__name__, self.__name__, name))
+        self._dependencies = dependencies
+        return dependencies
+
+
+    def _refresh(self, obj):
+        # entry: [dependency versions, value, version, epoch checked]
+        entry = obj._cache.get(self)
+        if entry is not None and entry[3] == obj._epoch:
+            return entry
+        dependencies = self._dependencies or self._resolve()
+        versions = [dependency.version(obj) for dependency in dependencies]
+        if entry is None:
+            entry = obj._cache[self] = [versions, self._func(obj), 0, obj._epoch]
         else:
-            self._telemetry[name] = value
+            if entry[0] != versions:
+                value = self._func(obj)
+                entry[0] = versions
+                if _changed(entry[1], value):
+                    entry[1] = value
+                    entry[2] += 1
+            entry[3] = obj._epoch
+        return entry
+
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self._refresh(obj)[1]
+
+
+    def version(self, obj):
+        return self._refresh(obj)[2]
+
+
+
+def telemetry_cache(*dependencies):
+    def inner_function(func):
+        return TelemetryCache(func, dependencies)
+    return inner_function
+
+
+
+class Telemetry(object):
+    # Fixed schema: fields are TelemetryField descriptors indexing _values and _versions,
+    # _epoch is incremented on any field change
+    __slots__ = ('_values', '_versions', '_epoch', '_cache')
+
+    def __init__(self):
+        self._values = [None] * len(FIELDS)
+        self._versions = [0] * len(FIELDS)
+        self._epoch = 0
+        self.projection_mode = PROJECTION.SHIP
+        self._cache = {}
 
 
     def str_km(self, param):
@@ -88,88 +246,147 @@ class Telemetry(object):
         10,000,000 -> 10.00M
         100,000,000 -> 100.0M
         """
-        value = self.__getattr__(param)
-        i_value = float(value)
-        n = 1
-        unit = None
-        if i_value < 0:
-            n = -1
-            i_value = -i_value
-
-        if i_value < 1000.0:
-            v = '%s' % (n * i_value)
-        elif i_value < 1000000.0:
-            v = '%s' % (n * i_value / 1000.0)
-            unit = 'K'
-        else:
-            v = '%s' % (n * i_value / 1000000.0)
-            unit = 'M'
-        if unit:
-            return '%s%s' % (v[:5], unit)
-        return '%s' % v[:6]
+        value = float(getattr(self, param))
+        magnitude = abs(value)
+        # Truncated repr, nan and inf fall in the M range
+        if magnitude < 1000.0:
+            return repr(value)[:6]
+        if magnitude < 1000000.0:
+            return repr(value / 1000.0)[:5] + 'K'
+        return repr(value / 1000000.0)[:5] + 'M'
+
+
+    @telemetry_cache('argument_of_periapsis', 'longitude_of_ascending_node', 'inclination', 'projection_mode')
+    def projection_matrix(self):
+        """
+        Project orbital plane coordinates, periapsis along x, on the display plane:
+        rotation by the argument of periapsis then by the longitude of ascending node,
+        x scaled by cos(inclination) in equatorial projection.
+        """
+        matrix = np.array([
+            [self.cos_longitude_of_periapsis, -self.sin_longitude_of_periapsis],
+            [self.sin_longitude_of_periapsis,  self.cos_longitude_of_periapsis]
+        ])
+        if self.projection_mode == PROJECTION.EQUATORIAL:
+            matrix[0] *= self.cos_inclination
+        return matrix
 
 
-    def projection(self, x, y):
-        if self.projection_mode == PROJECTION.SHIP:
-            return self.ship_projection(x, y)
-        elif self.projection_mode == PROJECTION.EQUATORIAL:
-            return self.equatorial_projection(x, y)
-        return None
+    @telemetry_cache('projection_matrix', 'longitude_of_ascending_node', 'inclination', 'argument_of_periapsis')
+    def display_matrix(self):
+        """
+        Project reference body frame coordinates, like the other vessels orbits, on the
+        display plane: on the orbital plane then through projection_matrix.
+        """
+        basis = kepler.perifocal_basis(self.longitude_of_ascending_node, self.inclination,
+                                       self.argument_of_periapsis)
+        return np.matmul(self.projection_matrix, basis)
 
 
-    def ship_projection(self, x, y):
-        proj_1 = np.array([
-            [self.cos_argument_of_periapsis, -self.sin_argument_of_periapsis],
-            [self.sin_argument_of_periapsis,  self.cos_argument_of_periapsis]
-        ])
-        proj_2 = np.array([
-            [self.cos_longitude_of_ascending_node, -self.sin_longitude_of_ascending_node],
-            [self.sin_longitude_of_ascending_node,  self.cos_longitude_of_ascending_node]
-        ])
-        point = np.array([x, y])
-        res = np.matmul(proj_1, point)
-        res = np.matmul(proj_2, res)
+    def project_points(self, points):
+        """
+        points: array of shape (2, n), x in first row and y in second row
+        """
+        return np.matmul(self.projection_matrix, points)
+
+
+    def projection(self, x, y):
+        res = self.project_points(np.array([x, y]))
         return res[0], res[1]
 
 
-    def equatorial_projection(self, x, y):
-        _x, _y = self.ship_projection(x, y)
-        return _x * self.cos_inclination, _y
+    def snapshot(self):
+        return TelemetrySnapshot._make(self._values[:len(TELEMETRY_FIELDS)])
+
+
+    def update_from_snapshot(self, snapshot):
+        for name, value in zip(TELEMETRY_FIELDS, snapshot):
+            setattr(self, name, value)
 
 
     def update_from_krpc_active_vessel(self, ut, active_vessel):
-        orbit = active_vessel.orbit
         self.ut = ut
-        self.update_from_krpc_orbit(orbit)
-        self.time_to_ascending_node = orbit.ut_at_true_anomaly(-self.argument_of_periapsis) - self.ut
-        self.time_to_descending_node = orbit.ut_at_true_anomaly(np.pi - self.argument_of_periapsis) - self.ut
+        self.update_from_krpc_orbit(active_vessel.orbit)
 
 
     def update_from_krpc_orbit(self, orbit):
-        self.apoapsis_altitude = orbit.apoapsis_altitude
-        self.periapsis_altitude = orbit.periapsis_altitude
-        self.eccentricity = orbit.eccentricity
-        self.time_to_apoapsis = orbit.time_to_apoapsis
-        self.time_to_periapsis = orbit.time_to_periapsis
-        self.period = orbit.period
-        self.inclination = orbit.inclination
-        self.longitude_of_ascending_node = orbit.longitude_of_ascending_node
-        self.argument_of_periapsis = orbit.argument_of_periapsis
-        self.apoapsis = orbit.apoapsis
-        self.periapsis = orbit.periapsis
+        for name in ORBIT_FIELDS:
+            setattr(self, name, getattr(orbit, name))
         self.ref_body_name = orbit.body.name.lower()
-        self.semi_major_axis = orbit.semi_major_axis
-        self.semi_minor_axis = orbit.semi_minor_axis
-        self.radius = orbit.radius
-        self.orbital_speed = orbit.orbital_speed
-        self.speed = orbit.speed
-        self.true_anomaly = orbit.true_anomaly
-        self.mean_anomaly = orbit.mean_anomaly
+        self.update_node_times()
+
+
+    def update_from_krpc_fast(self, ut, orbit):
+        """
+        Read only the FAST_ORBIT_FIELDS, the orbit plane and the body are assumed unchanged
+        """
+        self.ut = ut
+        for name in FAST_ORBIT_FIELDS:
+            setattr(self, name, getattr(orbit, name))
+        self.update_node_times()
+
+
+    def update_from_krpc_streams(self, streams):
+        self.ut = streams.ut()
+        for name, stream in streams.orbit.items():
+            setattr(self, name, stream())
+        self.ref_body_name = streams.ref_body_name
+        self.update_node_times()
+
+
+    def update_from_krpc_state_vector(self, ut, vessel, frames):
+        """
+        frames: BodyFrames giving the reference frame of the vessel body
+        """
+        ref_body_name, reference_frame, matrix = frames.get(vessel.orbit.body)
+        self.update_from_state_vector(ut, ref_body_name, matrix,
+                                      vessel.position(reference_frame), vessel.velocity(reference_frame))
+
+
+    def update_from_krpc_state_streams(self, streams):
+        self.update_from_state_vector(streams.ut(), streams.ref_body_name, streams.matrix,
+                                      streams.orbit['position'](), streams.orbit['velocity']())
+
+
+    def update_from_state_vector(self, ut, ref_body_name, matrix, position, velocity):
+        """
+        Compute the orbit from the vessel position and velocity relative to its
+        reference body, matrix converts them to the orbit reference frame.
+        """
+        body = BODIES.body(ref_body_name)
+        orbit = kepler.orbit_from_state_vector(body.mu, np.matmul(matrix, position), np.matmul(matrix, velocity))
+        self.ut = ut
+        for name, value in orbit.items():
+            setattr(self, name, float(value))
+        self.apoapsis_altitude = self.apoapsis - body.radius
+        self.periapsis_altitude = self.periapsis - body.radius
+        self.ref_body_name = ref_body_name
+        self.update_node_times()
+
+
+    def update_node_times(self):
+        self.time_to_ascending_node = self.time_to_true_anomaly(-self.argument_of_periapsis)
+        self.time_to_descending_node = self.time_to_true_anomaly(np.pi - self.argument_of_periapsis)
+
+
+    @telemetry_cache('eccentricity', 'period', 'semi_major_axis', 'ref_body_id')
+    def mean_motion(self):
+        if self.eccentricity < 1:
+            return 2 * np.pi / self.period
+        return float(kepler.mean_motion(BODIES.bodies[self.ref_body_id].mu, self.semi_major_axis))
+
+
+    def time_to_true_anomaly(self, true_anomaly):
+        """
+        Time until the vessel reach true_anomaly, computed locally like krpc
+        orbit.ut_at_true_anomaly(true_anomaly) - ut
+        """
+        return float(kepler.time_of_flight(self.true_anomaly, true_anomaly, self.eccentricity, self.mean_motion))
 
 
     @property
     def radius_altitude(self):
-        return self.radius - PLANET_DATA[self.ref_body_name]['radius'] * 1000
+        return self.radius - BODIES.bodies[self.ref_body_id].radius
 
 
     @property
@@ -215,7 +432,6 @@ class Telemetry(object):
     def inclination_deg(self):
         return np.rad2deg(self.inclination)
 
-    @property
     @telemetry_cache('inclination')
     def cos_inclination(self):
         return np.cos(self.inclination)
@@ -225,37 +441,31 @@ class Telemetry(object):
         return np.rad2deg(self.true_anomaly)
 
 
-    @property
     @telemetry_cache('longitude_of_ascending_node')
     def cos_longitude_of_ascending_node(self):
         return np.cos(self.longitude_of_ascending_node)
 
 
-    @property
     @telemetry_cache('longitude_of_ascending_node')
     def sin_longitude_of_ascending_node(self):
         return np.sin(self.longitude_of_ascending_node)
 
 
-    @property
     @telemetry_cache('argument_of_periapsis', 'longitude_of_ascending_node')
     def cos_longitude_of_periapsis(self):
         return np.cos(self.argument_of_periapsis + self.longitude_of_ascending_node)
 
 
-    @property
     @telemetry_cache('argument_of_periapsis', 'longitude_of_ascending_node')
     def sin_longitude_of_periapsis(self):
         return np.sin(self.argument_of_periapsis + self.longitude_of_ascending_node)
 
 
-    @property
     @telemetry_cache('argument_of_periapsis')
     def cos_argument_of_periapsis(self):
         return np.cos(self.argument_of_periapsis)
 
 
-    @property
     @telemetry_cache('argument_of_periapsis')
     def sin_argument_of_periapsis(self):
         return np.sin(self.argument_of_periapsis)
@@ -304,3 +514,9 @@ class Telemetry(object):
     @property
     def descending_node_y(self):
         return self.descending_node_radius * self.sin_argument_of_periapsis # sin(x+pi)=-sin(x)
+
+
+
+for _index, _name in enumerate(FIELDS):
+    setattr(Telemetry, _name, TelemetryField(_name, _index))
+Telemetry.ref_body_name = BodyNameField('ref_body_name', FIELDS.index('ref_body_name'), Telemetry.ref_body_id)
@@ -0,0 +1,47 @@
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject
+
+from panel.instrumentation import instrumentation
+from panel.mailbox import LatestValueMailbox
+
+
+
+class TelemetrySource(QObject):
+    """
+    Produce telemetry snapshots from a worker thread.
+    Snapshots are handed to the GUI through the mailbox, optionally recorded.
+    """
+    # Emitted when the mailbox receive a new snapshot while it was empty
+    telemetry_updated = pyqtSignal()
+
+    def __init__(self, recorder=None, **kwargs):
+        super(TelemetrySource, self).__init__(**kwargs)
+        self.mailbox = LatestValueMailbox()
+        # FleetSnapshot of the other vessels, taken with the next telemetry snapshot
+        self.fleet_mailbox = LatestValueMailbox()
+        self.recorder = recorder
+
+
+    @pyqtSlot()
+    def start(self):
+        # Runs in the worker thread
+        instrumentation.name_thread('telemetry worker')
+
+
+    @pyqtSlot()
+    def stop(self):
+        if self.recorder:
+            self.recorder.close()
+
+
+    def begin_frame(self):
+        """
+        Called before producing a snapshot, tag the worker trace events with its frame number
+        """
+        instrumentation.set_frame(self.mailbox.put_count + 1)
+
+
+    def publish(self, snapshot):
+        if self.recorder:
+            self.recorder.record(snapshot)
+        if self.mailbox.put(snapshot):
+            self.telemetry_updated.emit()